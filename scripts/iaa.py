@@ -14,23 +14,124 @@ import argparse
 import json
 import sys
 from collections import defaultdict
+from dataclasses import dataclass
+from importlib.util import find_spec
 from itertools import combinations
 
+# NumPy and Numba are imported on first use (see _np()) so that --help and
+# small exports don't pay their import cost.
+HAS_NUMPY = find_spec('numpy') is not None
+HAS_NUMBA = find_spec('numba') is not None
+np = None
+
 try:
-    import krippendorff
-    HAS_KRIPPENDORFF = True
+    import ijson
+    HAS_IJSON = True
 except ImportError:
-    HAS_KRIPPENDORFF = False
+    HAS_IJSON = False
 
 try:
-    import numpy as np
-    HAS_NUMPY = True
+    import orjson
+    HAS_ORJSON = True
 except ImportError:
-    HAS_NUMPY = False
+    HAS_ORJSON = False
+
+
+def _np():
+    """Import NumPy once and bind it to the module-level np."""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
 
 
 # ─── Data extraction ─────────────────────────────────────────────────────────
 
+def task_results(task):
+    """Yield (task_id, annotator, result_type, value) for each result in a task.
+
+    An annotation with no results yields a single (task_id, annotator, None, None)
+    so that every annotator who submitted something is still accounted for.
+    """
+    task_id = task.get('id')
+    for ann in task.get('annotations', []):
+        annotator = ann.get('completed_by', ann.get('id', 'unknown'))
+        results = ann.get('result', [])
+        if not results:
+            yield task_id, annotator, None, None
+        for result in results:
+            yield task_id, annotator, result.get('type', ''), result.get('value', {})
+
+
+def walk_results(data):
+    """Flatten an export into (task_id, annotator, result_type, value) tuples.
+
+    This is the single traversal of the task → annotations → result nesting
+    that every extractor below filters.
+    """
+    for task in data:
+        yield from task_results(task)
+
+
+def _classification_from_results(results):
+    tasks = defaultdict(dict)
+    annotators = set()
+
+    for task_id, annotator, rtype, value in results:
+        annotators.add(annotator)
+        if rtype in ('choices', 'taxonomy'):
+            values = value.get('choices', [])
+            if values:
+                # For single-label: take first choice
+                tasks[task_id][annotator] = values[0]
+
+    return dict(tasks), annotators
+
+
+def _span_from_results(results):
+    tasks = defaultdict(lambda: defaultdict(list))
+    annotators = set()
+
+    for task_id, annotator, rtype, value in results:
+        annotators.add(annotator)
+        if rtype in ('labels', 'paragraphlabels'):
+            start = value.get('start', value.get('startOffset', 0))
+            end = value.get('end', value.get('endOffset', 0))
+            labels = value.get('labels', value.get('paragraphlabels', []))
+            for label in labels:
+                tasks[task_id][annotator].append((start, end, label))
+
+    # Convert to regular dicts
+    return {k: dict(v) for k, v in tasks.items()}, annotators
+
+
+def _paragraph_from_results(results):
+    tasks = defaultdict(lambda: defaultdict(dict))
+    annotators = set()
+
+    for task_id, annotator, rtype, value in results:
+        annotators.add(annotator)
+        if rtype == 'paragraphlabels':
+            start = value.get('start', value.get('startOffset', 0))
+            end = value.get('end', value.get('endOffset', start + 1))
+            labels = value.get('paragraphlabels', [])
+            if labels:
+                # Map each paragraph index in the span to the label
+                for idx in range(start, end):
+                    tasks[task_id][annotator][idx] = labels[0]
+
+    return {k: dict(v) for k, v in tasks.items()}, annotators
+
+
+def _paragraph_count(task):
+    """Number of paragraphs in a task's data, or None for non-paragraph text."""
+    text_data = task.get('data', {}).get('text', '')
+    if isinstance(text_data, list):
+        return len(text_data)
+    return None
+
+
 def extract_classification_annotations(data):
     """Extract classification labels per (task_id, annotator) pair.
     
@@ -38,23 +139,7 @@ def extract_classification_annotations(data):
         tasks: dict of task_id -> {annotator_id: label}
         annotators: set of annotator IDs
     """
-    tasks = defaultdict(dict)
-    annotators = set()
-
-    for task in data:
-        task_id = task['id']
-        for ann in task.get('annotations', []):
-            annotator = ann.get('completed_by', ann.get('id', 'unknown'))
-            annotators.add(annotator)
-
-            for result in ann.get('result', []):
-                if result.get('type') in ('choices', 'taxonomy'):
-                    values = result.get('value', {}).get('choices', [])
-                    if values:
-                        # For single-label: take first choice
-                        tasks[task_id][annotator] = values[0]
-
-    return dict(tasks), annotators
+    return _classification_from_results(walk_results(data))
 
 
 def extract_span_annotations(data):
@@ -64,26 +149,7 @@ def extract_span_annotations(data):
         tasks: dict of task_id -> {annotator_id: [(start, end, label), ...]}
         annotators: set of annotator IDs
     """
-    tasks = defaultdict(lambda: defaultdict(list))
-    annotators = set()
-
-    for task in data:
-        task_id = task['id']
-        for ann in task.get('annotations', []):
-            annotator = ann.get('completed_by', ann.get('id', 'unknown'))
-            annotators.add(annotator)
-
-            for result in ann.get('result', []):
-                if result.get('type') in ('labels', 'paragraphlabels'):
-                    value = result.get('value', {})
-                    start = value.get('start', value.get('startOffset', 0))
-                    end = value.get('end', value.get('endOffset', 0))
-                    labels = value.get('labels', value.get('paragraphlabels', []))
-                    for label in labels:
-                        tasks[task_id][annotator].append((start, end, label))
-
-    # Convert to regular dicts
-    return {k: dict(v) for k, v in tasks.items()}, annotators
+    return _span_from_results(walk_results(data))
 
 
 def extract_paragraph_annotations(data):
@@ -96,33 +162,13 @@ def extract_paragraph_annotations(data):
         annotators: set of annotator IDs
         paragraph_counts: dict of task_id -> number of paragraphs
     """
-    tasks = defaultdict(lambda: defaultdict(dict))
-    annotators = set()
     paragraph_counts = {}
-
     for task in data:
-        task_id = task['id']
-        # Count paragraphs in data
-        text_data = task.get('data', {}).get('text', '')
-        if isinstance(text_data, list):
-            paragraph_counts[task_id] = len(text_data)
-
-        for ann in task.get('annotations', []):
-            annotator = ann.get('completed_by', ann.get('id', 'unknown'))
-            annotators.add(annotator)
-
-            for result in ann.get('result', []):
-                if result.get('type') == 'paragraphlabels':
-                    value = result.get('value', {})
-                    start = value.get('start', value.get('startOffset', 0))
-                    end = value.get('end', value.get('endOffset', start + 1))
-                    labels = value.get('paragraphlabels', [])
-                    if labels:
-                        # Map each paragraph index in the span to the label
-                        for idx in range(start, end):
-                            tasks[task_id][annotator][idx] = labels[0]
-
-    return {k: dict(v) for k, v in tasks.items()}, annotators, paragraph_counts
+        n_paras = _paragraph_count(task)
+        if n_paras is not None:
+            paragraph_counts[task['id']] = n_paras
+    tasks, annotators = _paragraph_from_results(walk_results(data))
+    return tasks, annotators, paragraph_counts
 
 
 # ─── Agreement metrics ───────────────────────────────────────────────────────
@@ -168,42 +214,301 @@ def percent_agreement(labels_a, labels_b):
     return agree / len(shared)
 
 
-def krippendorff_alpha(tasks, annotators, label_set=None):
-    """Compute Krippendorff's alpha for multiple annotators.
-    
-    tasks: dict of item_id -> {annotator_id: label}
+def _label_map(tasks):
+    """Map every label seen in tasks to a stable integer code."""
+    label_set = set()
+    for item_labels in tasks.values():
+        label_set.update(item_labels.values())
+    return {label: i for i, label in enumerate(sorted(label_set))}
+
+
+@dataclass
+class ReliabilityData:
+    """Int-coded reliability matrix shared by every metric in a report section.
+
+    matrix is (annotators × items) with np.nan for missing values; rows follow
+    annotators, columns follow items, and labels are coded via label_map.
     """
-    if not HAS_KRIPPENDORFF or not HAS_NUMPY:
+    annotators: list
+    items: list
+    label_map: dict
+    matrix: object
+
+
+def build_reliability(tasks, annotators, label_set=None):
+    """Build ReliabilityData from item_id -> {annotator_id: label}.
+
+    Returns None when NumPy is unavailable.
+    """
+    if not HAS_NUMPY:
         return None
+    np = _np()
 
     annotator_list = sorted(annotators)
     items = sorted(tasks.keys())
+    if label_set is None:
+        label_map = _label_map(tasks)
+    else:
+        label_map = {label: i for i, label in enumerate(sorted(label_set))}
+    ann_idx = {a: i for i, a in enumerate(annotator_list)}
 
-    if not items or len(annotator_list) < 2:
-        return None
+    # Collect (row, col, value) triples, then scatter them in one assignment
+    rows, cols, vals = [], [], []
+    for j, item in enumerate(items):
+        for annotator, label in tasks[item].items():
+            if label in label_map and annotator in ann_idx:
+                rows.append(ann_idx[annotator])
+                cols.append(j)
+                vals.append(label_map[label])
 
-    # Build label-to-int mapping
-    if label_set is None:
-        label_set = set()
-        for item_labels in tasks.values():
-            for label in item_labels.values():
-                label_set.add(label)
-    label_map = {label: i for i, label in enumerate(sorted(label_set))}
-
-    # Build reliability matrix (annotators × items)
-    # Use np.nan for missing values
     matrix = np.full((len(annotator_list), len(items)), np.nan)
-    for j, item in enumerate(items):
-        for i, annotator in enumerate(annotator_list):
-            label = tasks[item].get(annotator)
-            if label is not None and label in label_map:
-                matrix[i, j] = label_map[label]
-
-    try:
-        alpha = krippendorff.alpha(reliability_data=matrix, level_of_measurement='nominal')
-        return alpha
-    except Exception:
+    if vals:
+        matrix[np.array(rows), np.array(cols)] = np.array(vals, dtype=np.float64)
+    return ReliabilityData(annotator_list, items, label_map, matrix)
+
+
+def intern_classification(results):
+    """Intern classification results into integer struct-of-arrays form.
+
+    Returns (annotator_ids, task_ids, labels, ti, ai, li): the id lists are in
+    first-seen order, and ti/ai/li are parallel int lists with one entry per
+    choice in export order. Every annotator is interned, labelled or not.
+    """
+    annot_ids, task_ids, label_ids = {}, {}, {}
+    ti, ai, li = [], [], []
+    for task_id, annotator, rtype, value in results:
+        a = annot_ids.setdefault(annotator, len(annot_ids))
+        if rtype in ('choices', 'taxonomy'):
+            values = value.get('choices', [])
+            if values:
+                ti.append(task_ids.setdefault(task_id, len(task_ids)))
+                ai.append(a)
+                li.append(label_ids.setdefault(values[0], len(label_ids)))
+    return list(annot_ids), list(task_ids), list(label_ids), ti, ai, li
+
+
+def _sorted_ranks(ids):
+    """Return (sorted ids, rank of each first-seen index within them)."""
+    np = _np()
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    ranks = np.empty(len(ids), dtype=np.int64)
+    ranks[order] = np.arange(len(ids))
+    return [ids[i] for i in order], ranks
+
+
+def reliability_from_codes(annotator_ids, task_ids, labels, ti, ai, li):
+    """Build ReliabilityData straight from intern_classification() output.
+
+    Produces the same matrix as build_reliability() on the equivalent task
+    dict, without materializing that dict.
+    """
+    np = _np()
+    annotator_list, a_rank = _sorted_ranks(annotator_ids)
+    items, t_rank = _sorted_ranks(task_ids)
+    label_list, l_rank = _sorted_ranks(labels)
+
+    matrix = np.full((len(annotator_list), len(items)), np.nan)
+    if ti:
+        rows = a_rank[np.asarray(ai)]
+        cols = t_rank[np.asarray(ti)]
+        vals = l_rank[np.asarray(li)]
+        # Later choices by the same annotator on the same task win
+        key = (rows * len(items) + cols)[::-1]
+        _, first = np.unique(key, return_index=True)
+        last = len(key) - 1 - first
+        # Drop labels that were only ever overwritten
+        kept, vals = np.unique(vals[last], return_inverse=True)
+        label_list = [label_list[k] for k in kept.tolist()]
+        matrix[rows[last], cols[last]] = vals.ravel()
+    else:
+        label_list = []
+
+    label_map = {label: i for i, label in enumerate(label_list)}
+    return ReliabilityData(annotator_list, items, label_map, matrix)
+
+
+def _alpha_nominal(matrix):
+    """Nominal Krippendorff's alpha on a prebuilt reliability matrix.
+
+    matrix: (raters × units) float array with np.nan for missing values.
+    Computed from the coincidence matrix: alpha = 1 - (n - 1) * (n - Σ o_cc) /
+    (n² - Σ n_c²), using only units rated at least twice. Returns None when
+    alpha is undefined (fewer than two distinct values, or no pairable units).
+    """
+    np = _np()
+    present = ~np.isnan(matrix)
+    values, codes = np.unique(matrix[present], return_inverse=True)
+    n_values = len(values)
+    if n_values < 2:
+        return None
+
+    # counts[u, c]: how many raters gave value c to unit u
+    n_units = matrix.shape[1]
+    units = np.nonzero(present)[1]
+    counts = np.bincount(units * n_values + codes.ravel(),
+                         minlength=n_units * n_values).reshape(n_units, n_values)
+    m_u = counts.sum(axis=1)
+    pairable = m_u >= 2
+    counts = counts[pairable]
+    m_u = m_u[pairable]
+
+    n = m_u.sum()
+    n_c = counts.sum(axis=0)
+    expected = float(n * n - (n_c * n_c).sum())
+    if expected == 0:
         return None
+    agree = ((counts * (counts - 1)).sum(axis=1) / (m_u - 1)).sum()
+    return 1.0 - (n - 1) * (n - agree) / expected
+
+
+def krippendorff_alpha_from(rd):
+    """Compute Krippendorff's alpha from prebuilt ReliabilityData."""
+    if rd is None:
+        return None
+    if not rd.items or len(rd.annotators) < 2:
+        return None
+    return _alpha_nominal(rd.matrix)
+
+
+def krippendorff_alpha(tasks, annotators, label_set=None):
+    """Compute Krippendorff's alpha for multiple annotators.
+    
+    tasks: dict of item_id -> {annotator_id: label}
+    """
+    if not HAS_NUMPY:
+        return None
+    return krippendorff_alpha_from(build_reliability(tasks, annotators, label_set))
+
+
+def per_label_alpha(rd):
+    """Yield (label, count, alpha) treating each label as a binary is/isn't code.
+
+    Each label is a comparison against the shared matrix, so nothing is
+    rebuilt per label. Yields nothing without NumPy.
+    """
+    if rd is None:
+        return
+    np = _np()
+
+    missing = np.isnan(rd.matrix)
+    for label, li in rd.label_map.items():
+        hits = rd.matrix == li
+        binary = np.where(missing, np.nan, hits)
+        yield label, int(hits.sum()), _alpha_nominal(binary)
+
+
+def _agreement_counts_np(codes_a, codes_b, n_labels):
+    """Return (shared, po, pe) for two code rows, -1 marking missing values."""
+    np = _np()
+    mask = (codes_a >= 0) & (codes_b >= 0)
+    shared = int(mask.sum())
+    if not shared:
+        return 0, 0.0, 0.0
+
+    # Contingency table from packed (a, b) codes in a single bincount
+    ct = np.bincount(codes_a[mask] * n_labels + codes_b[mask],
+                     minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+    po = float(np.trace(ct)) / shared
+    pe = float((ct.sum(axis=1) / shared * ct.sum(axis=0) / shared).sum())
+    return shared, po, pe
+
+
+def _agreement_counts_loop(codes_a, codes_b, n_labels):
+    """Single-pass equivalent of _agreement_counts_np(), compiled by Numba."""
+    ct = np.zeros((n_labels, n_labels), np.int64)
+    shared = 0
+    for k in range(codes_a.size):
+        if codes_a[k] >= 0 and codes_b[k] >= 0:
+            ct[codes_a[k], codes_b[k]] += 1
+            shared += 1
+    if shared == 0:
+        return 0, 0.0, 0.0
+
+    agree = 0
+    pe = 0.0
+    for x in range(n_labels):
+        agree += ct[x, x]
+        row = 0
+        col = 0
+        for y in range(n_labels):
+            row += ct[x, y]
+            col += ct[y, x]
+        pe += row / shared * col / shared
+    return shared, agree / shared, pe
+
+
+# Below this many compared cells (annotator pairs x items) the NumPy kernel
+# finishes before Numba could even import and compile the loop kernel
+# (~0.7s). Past it, e.g. 500 pairs over 200k items, the JIT saves more.
+_JIT_MIN_CELLS = 100_000_000
+_agreement_counts_jit = None
+
+
+def _get_agreement_counts(cells):
+    """Return the agreement kernel for comparing this many cells.
+
+    NumPy unless the workload clears _JIT_MIN_CELLS; the Numba kernel is
+    compiled on first such call and reused for the rest of the process.
+    """
+    global _agreement_counts_jit
+    if not HAS_NUMBA or cells < _JIT_MIN_CELLS:
+        return _agreement_counts_np
+    if _agreement_counts_jit is None:
+        _agreement_counts_jit = _agreement_counts_np
+        # Fall back to NumPy if the JIT is unusable here
+        try:
+            from numba import njit
+            np = _np()
+            jit = njit(_agreement_counts_loop)
+            warm = np.zeros(2, np.int64)
+            jit(warm, warm, 1)
+            _agreement_counts_jit = jit
+        except Exception:
+            pass
+    return _agreement_counts_jit
+
+
+def _kappa_from_codes(codes_a, codes_b, n_labels, counts=_agreement_counts_np):
+    """Cohen's kappa and percent agreement for two rows of -1-padded codes.
+
+    counts is the kernel from _get_agreement_counts(). Returns (kappa,
+    agreement, shared) with the same None conventions as cohens_kappa() and
+    percent_agreement().
+    """
+    shared, po, pe = counts(codes_a, codes_b, n_labels)
+    if not shared:
+        return None, None, 0
+    if shared < 2:
+        return None, po, shared
+    if pe == 1.0:
+        return 1.0, po, shared
+    return (po - pe) / (1 - pe), po, shared
+
+
+def pairwise_agreement(tasks, annotator_list, rd=None):
+    """Yield (a1, a2, shared, percent_agreement, kappa) for every annotator pair.
+
+    tasks: dict of item_id -> {annotator_id: label} (unused when rd is given)
+    rd: optional ReliabilityData already built from tasks and annotator_list
+    """
+    if rd is None:
+        rd = build_reliability(tasks, annotator_list)
+    if rd is not None:
+        np = _np()
+        n_labels = len(rd.label_map)
+        codes = np.where(np.isnan(rd.matrix), -1, rd.matrix).astype(np.int64)
+        n = len(rd.annotators)
+        counts = _get_agreement_counts(n * (n - 1) // 2 * len(rd.items))
+        for (i, a1), (j, a2) in combinations(enumerate(rd.annotators), 2):
+            k, p, shared = _kappa_from_codes(codes[i], codes[j], n_labels, counts)
+            yield a1, a2, shared, p, k
+        return
+
+    for a1, a2 in combinations(annotator_list, 2):
+        labels_a = {k: v[a1] for k, v in tasks.items() if a1 in v}
+        labels_b = {k: v[a2] for k, v in tasks.items() if a2 in v}
+        shared = len(set(labels_a.keys()) & set(labels_b.keys()))
+        yield a1, a2, shared, percent_agreement(labels_a, labels_b), cohens_kappa(labels_a, labels_b)
 
 
 def span_exact_match(spans_a, spans_b):
@@ -211,9 +516,11 @@ def span_exact_match(spans_a, spans_b):
     
     spans: list of (start, end, label) tuples
     """
-    set_a = set(spans_a)
-    set_b = set(spans_b)
+    return _pr_from_sets(set(spans_a), set(spans_b))
+
 
+def _pr_from_sets(set_a, set_b):
+    """Exact-match precision, recall and F1 between two prebuilt span sets."""
     if not set_a and not set_b:
         return 1.0, 1.0, 1.0  # perfect agreement on empty
 
@@ -227,27 +534,47 @@ def span_exact_match(spans_a, spans_b):
 
 # ─── Auto-detect task type ───────────────────────────────────────────────────
 
+def _detect_from_results(results):
+    for _, _, rtype, _ in results:
+        if rtype in ('choices', 'taxonomy'):
+            return 'classification'
+        elif rtype == 'paragraphlabels':
+            return 'paragraph'
+        elif rtype == 'labels':
+            return 'span'
+    return 'unknown'
+
+
 def detect_task_type(data):
     """Auto-detect whether annotations are classification, spans, or paragraphs."""
-    for task in data:
-        for ann in task.get('annotations', []):
-            for result in ann.get('result', []):
-                rtype = result.get('type', '')
-                if rtype in ('choices', 'taxonomy'):
-                    return 'classification'
-                elif rtype == 'paragraphlabels':
-                    return 'paragraph'
-                elif rtype == 'labels':
-                    return 'span'
-    return 'unknown'
+    return _detect_from_results(walk_results(data))
 
 
 # ─── Report generation ───────────────────────────────────────────────────────
 
 def generate_report(data, task_type=None, fmt='text'):
-    """Generate an IAA report from Label Studio export data."""
+    """Generate an IAA report from Label Studio export data.
+
+    data may be a list of tasks or any re-iterable of tasks (e.g. StreamedExport).
+    """
+    # Single pass over the export: summary counts, paragraph counts, and the
+    # flattened results that detection and every extractor work from
+    total_tasks = annotated = total_annotations = 0
+    para_counts = {}
+    results = []
+    for t in data:
+        anns = t.get('annotations', [])
+        total_tasks += 1
+        if anns:
+            annotated += 1
+        total_annotations += len(anns)
+        n_paras = _paragraph_count(t)
+        if n_paras is not None:
+            para_counts[t['id']] = n_paras
+        results.extend(task_results(t))
+
     if task_type is None:
-        task_type = detect_task_type(data)
+        task_type = _detect_from_results(results)
 
     lines = []
 
@@ -285,43 +612,44 @@ def generate_report(data, task_type=None, fmt='text'):
         lines.append("\n  📊 Inter-Annotator Agreement Report")
 
     # Summary stats
-    total_tasks = len(data)
-    annotated = sum(1 for t in data if t.get('annotations'))
-    total_annotations = sum(len(t.get('annotations', [])) for t in data)
     heading("Summary")
     line(f"Tasks: {total_tasks} ({annotated} annotated)")
     line(f"Total annotations: {total_annotations}")
     line(f"Detected task type: {task_type}")
 
     if task_type == 'classification':
-        tasks, annotators = extract_classification_annotations(data)
-        annotator_list = sorted(annotators)
+        if HAS_NUMPY:
+            # Integer-coded path: no per-task dicts, counts come from the matrix
+            np = _np()
+            tasks = None
+            rd = reliability_from_codes(*intern_classification(results))
+            annotator_list = rd.annotators
+            counts = (~np.isnan(rd.matrix)).sum(axis=1).tolist()
+        else:
+            tasks, annotators = _classification_from_results(results)
+            rd = None
+            annotator_list = sorted(annotators)
+            counts = [sum(1 for t in tasks.values() if a in t) for a in annotator_list]
 
         heading("Annotators")
-        for a in annotator_list:
-            count = sum(1 for t in tasks.values() if a in t)
+        for a, count in zip(annotator_list, counts):
             line(f"Annotator {a}: {count} items annotated")
 
         # Pairwise Cohen's kappa
         if len(annotator_list) >= 2:
             heading("Pairwise Agreement")
-            for a1, a2 in combinations(annotator_list, 2):
-                labels_a = {k: v[a1] for k, v in tasks.items() if a1 in v}
-                labels_b = {k: v[a2] for k, v in tasks.items() if a2 in v}
-                k = cohens_kappa(labels_a, labels_b)
-                p = percent_agreement(labels_a, labels_b)
-                shared = len(set(labels_a.keys()) & set(labels_b.keys()))
+            for a1, a2, shared, p, k in pairwise_agreement(tasks, annotator_list, rd):
                 line(f"\nAnnotators {a1} vs {a2} ({shared} shared items):")
                 metric("  Percent agreement", p)
                 metric("  Cohen's kappa", k, interpret_kappa(k))
 
         # Krippendorff's alpha (all annotators)
         heading("Overall Agreement")
-        alpha = krippendorff_alpha(tasks, annotators)
+        alpha = krippendorff_alpha_from(rd)
         metric("Krippendorff's alpha", alpha, interpret_kappa(alpha))
 
     elif task_type == 'paragraph':
-        tasks, annotators, para_counts = extract_paragraph_annotations(data)
+        tasks, annotators = _paragraph_from_results(results)
         annotator_list = sorted(annotators)
 
         heading("Annotators")
@@ -330,59 +658,44 @@ def generate_report(data, task_type=None, fmt='text'):
             line(f"Annotator {a}: {count} tasks annotated")
 
         # Convert paragraph annotations to flat classification for IAA
-        # Each (task_id, paragraph_idx) is an item, label is the annotation
-        flat_tasks = {}
+        # Each (task_id, paragraph_idx) within the task's paragraphs is an
+        # item, label is the annotation; only items with 2+ annotations are kept
+        multi = {}
         for task_id, ann_dict in tasks.items():
             n_paras = para_counts.get(task_id, 0)
-            for para_idx in range(n_paras):
-                item_key = (task_id, para_idx)
-                flat_tasks[item_key] = {}
-                for annotator, para_labels in ann_dict.items():
-                    if para_idx in para_labels:
-                        flat_tasks[item_key][annotator] = para_labels[para_idx]
-
-        # Only keep items with 2+ annotations
-        multi = {k: v for k, v in flat_tasks.items() if len(v) >= 2}
+            per_para = defaultdict(dict)
+            for annotator, para_labels in ann_dict.items():
+                for para_idx, label in para_labels.items():
+                    if 0 <= para_idx < n_paras:
+                        per_para[para_idx][annotator] = label
+            for para_idx, labels in per_para.items():
+                if len(labels) >= 2:
+                    multi[(task_id, para_idx)] = labels
         line(f"\nSentences with 2+ annotations: {len(multi)}")
 
         if len(annotator_list) >= 2 and multi:
+            rd = build_reliability(multi, annotators)
+
             heading("Pairwise Agreement (sentence-level)")
-            for a1, a2 in combinations(annotator_list, 2):
-                labels_a = {k: v[a1] for k, v in multi.items() if a1 in v}
-                labels_b = {k: v[a2] for k, v in multi.items() if a2 in v}
-                k = cohens_kappa(labels_a, labels_b)
-                p = percent_agreement(labels_a, labels_b)
-                shared = len(set(labels_a.keys()) & set(labels_b.keys()))
+            for a1, a2, shared, p, k in pairwise_agreement(multi, annotator_list, rd):
                 line(f"\nAnnotators {a1} vs {a2} ({shared} shared sentences):")
                 metric("  Percent agreement", p)
                 metric("  Cohen's kappa", k, interpret_kappa(k))
 
             heading("Overall Agreement (sentence-level)")
-            alpha = krippendorff_alpha(multi, annotators)
+            alpha = krippendorff_alpha_from(rd)
             metric("Krippendorff's alpha", alpha, interpret_kappa(alpha))
 
             # Per-label breakdown
             heading("Per-Label Agreement")
-            all_labels = set()
-            for v in multi.values():
-                all_labels.update(v.values())
-
-            for label in sorted(all_labels):
+            alphas = {label: (count, alpha) for label, count, alpha in per_label_alpha(rd)}
+            for label in (rd.label_map if rd is not None else _label_map(multi)):
                 # Binary: did annotators agree this sentence is/isn't this label?
-                binary_tasks = {}
-                for item_key, ann_dict in multi.items():
-                    binary_tasks[item_key] = {
-                        a: (1 if ann_dict.get(a) == label else 0)
-                        for a in annotator_list if a in ann_dict
-                    }
-                binary_multi = {k: v for k, v in binary_tasks.items() if len(v) >= 2}
-                if binary_multi:
-                    alpha = krippendorff_alpha(binary_multi, annotators)
-                    count = sum(1 for v in multi.values() for lbl in v.values() if lbl == label)
-                    line(f"  {label} (n={count}): alpha={alpha:.3f}" if alpha is not None else f"  {label}: N/A")
+                count, alpha = alphas.get(label, (None, None))
+                line(f"  {label} (n={count}): alpha={alpha:.3f}" if alpha is not None else f"  {label}: N/A")
 
     elif task_type == 'span':
-        tasks, annotators = extract_span_annotations(data)
+        tasks, annotators = _span_from_results(results)
         annotator_list = sorted(annotators)
 
         heading("Annotators")
@@ -392,6 +705,9 @@ def generate_report(data, task_type=None, fmt='text'):
             line(f"Annotator {a}: {count} tasks, {total_spans} spans")
 
         if len(annotator_list) >= 2:
+            # Hash each annotator's spans once, not once per pair they appear in
+            span_sets = {t: {a: frozenset(v) for a, v in ad.items()} for t, ad in tasks.items()}
+
             heading("Pairwise Span Agreement (Exact Match)")
             for a1, a2 in combinations(annotator_list, 2):
                 shared_tasks = [t for t in tasks if a1 in tasks[t] and a2 in tasks[t]]
@@ -400,7 +716,7 @@ def generate_report(data, task_type=None, fmt='text'):
 
                 precisions, recalls, f1s = [], [], []
                 for t in shared_tasks:
-                    p, r, f1 = span_exact_match(tasks[t][a1], tasks[t][a2])
+                    p, r, f1 = _pr_from_sets(span_sets[t][a1], span_sets[t][a2])
                     precisions.append(p)
                     recalls.append(r)
                     f1s.append(f1)
@@ -434,6 +750,53 @@ def generate_report(data, task_type=None, fmt='text'):
 
 # ─── CLI ─────────────────────────────────────────────────────────────────────
 
+# A run of 19+ digits may be an integer past 64 bits (see load_export); the
+# run is found by mapping digits to '0' and searching for nineteen of them
+_DIGITS_TO_ZERO = bytes(0x30 if 0x30 <= b <= 0x39 else 0x20 for b in range(256))
+
+
+class StreamedExport:
+    """Re-iterable view of a Label Studio export that streams tasks from disk.
+
+    Each iteration reopens the file and parses one task at a time with ijson,
+    so peak memory is bounded by a single task rather than the whole export.
+    If ijson's C backend rejects a number json accepts (integers past 64
+    bits, 1e400, NaN), the remaining tasks come from a full json parse.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        done = 0
+        with open(self.path, 'rb') as f:
+            try:
+                for task in ijson.items(f, 'item', use_float=True):
+                    yield task
+                    done += 1
+                return
+            except (ijson.JSONError, OverflowError):
+                f.seek(0)
+                data = f.read()
+        yield from json.loads(data)[done:]
+
+
+def load_export(path):
+    """Load a Label Studio export, streaming it when ijson is available."""
+    if HAS_IJSON:
+        return StreamedExport(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    # orjson rejects some input json accepts (NaN, 1e400) and reads integers
+    # past 64 bits as floats; such exports go through json
+    if HAS_ORJSON and b'0' * 19 not in data.translate(_DIGITS_TO_ZERO):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Compute inter-annotator agreement from Label Studio exports')
     parser.add_argument('export_file', help='Label Studio JSON export file')
@@ -444,10 +807,9 @@ def main():
     parser.add_argument('--output', '-o', help='Write report to file instead of stdout')
     args = parser.parse_args()
 
-    with open(args.export_file, encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_export(args.export_file)
 
-    if not data:
+    if next(iter(data), None) is None:
         print("Empty export file.")
         sys.exit(1)
 
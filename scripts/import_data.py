@@ -3,95 +3,271 @@
 
 Reads data from common formats, applies transforms (sentence splitting,
 shuffling, filtering), and outputs Label Studio-compatible JSON.
+
+Loaders emit items directly in Label Studio task shape:
+{'data': {'text': ..., 'meta': {...}}}
 """
 import argparse
 import csv
 import json
+import mmap
 import os
 import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from importlib.util import find_spec
 from pathlib import Path
 
-import yaml
+# NLTK and PyYAML are imported where they're used so that --help and
+# runs that don't need them skip their import cost.
+HAS_NLTK = find_spec('nltk') is not None
 
 try:
-    import nltk
-    HAS_NLTK = True
+    import ijson
+    HAS_IJSON = True
 except ImportError:
-    HAS_NLTK = False
+    HAS_IJSON = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# orjson is stricter than json: it rejects NaN/Infinity and floats that
+# overflow (1e400), and refuses to write integers past 64 bits. Inputs it
+# can't read are retried with json, and once that has happened output goes
+# through json too, since orjson would write the resulting inf/nan as null.
+_STDLIB_JSON = not HAS_ORJSON
+
+
+# orjson reads integers past 64 bits as floats, silently dropping digits.
+# Any run of 19+ digits might be one, so such input is parsed by json. The
+# check maps every digit to '0' in one translate() pass and then does a
+# substring search, several times faster than a regex over the same bytes.
+_DIGITS_TO_ZERO = bytes(0x30 if 0x30 <= b <= 0x39 else 0x20 for b in range(256))
+
+
+def _has_long_digit_run(data):
+    """True if data contains 19 or more consecutive ASCII digits."""
+    return b'0' * 19 in data.translate(_DIGITS_TO_ZERO)
+
+
+def _loads(data):
+    """Parse JSON bytes, using orjson when it can read them exactly."""
+    global _STDLIB_JSON
+    if not _STDLIB_JSON and not _has_long_digit_run(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            _STDLIB_JSON = True
+    return json.loads(data)
+
+
+def _dumps(obj):
+    """Serialize obj as indented UTF-8 JSON bytes, using orjson when it can."""
+    if not _STDLIB_JSON:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _dumps_line(obj):
+    """Serialize obj as one compact line of UTF-8 JSON, trailing newline included."""
+    if not _STDLIB_JSON:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def find_files(source, suffixes):
+    """Return files under source ending in any of suffixes, sorted by path.
+
+    Walks the tree once with os.scandir, so loaders that accept several
+    extensions do not traverse the directory once per extension.
+    """
+    found = []
+    stack = [str(source)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffixes):
+                    found.append(Path(entry.path))
+    return sorted(found)
+
+
+# Below this size a plain read is cheaper than setting up a memory map
+_MMAP_MIN_SIZE = 64 * 1024
+_ASCII_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+
+def _read_text(path):
+    """Read a UTF-8 text file and strip surrounding whitespace.
+
+    Large files are memory-mapped and only the stripped span is decoded, so
+    the raw bytes never become a separate heap copy. Newlines are normalized
+    the same way as Path.read_text().
+    """
+    if path.stat().st_size < _MMAP_MIN_SIZE:
+        return path.read_text(encoding='utf-8').strip()
+
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, end = 0, len(mm)
+        while start < end and mm[start] in _ASCII_WHITESPACE:
+            start += 1
+        while end > start and mm[end - 1] in _ASCII_WHITESPACE:
+            end -= 1
+        with memoryview(mm) as view:
+            text = str(view[start:end], 'utf-8')
+
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.strip()
+
+
+# Fewer files than this are loaded in a plain loop; the pool's setup and
+# per-task hand-off cost more than they could save
+_PARALLEL_MIN_FILES = 16
+
+
+def _usable_cpus():
+    """Number of CPUs this process may run on, honouring CPU affinity."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _load_all(files, load_one):
+    """Run load_one over files and concatenate the items in file order.
+
+    Files are spread over a thread pool only when more than one CPU is
+    usable and there are at least _PARALLEL_MIN_FILES of them; otherwise a
+    serial loop is cheaper.
+    """
+    workers = min(len(files), _usable_cpus())
+    if workers <= 1 or len(files) < _PARALLEL_MIN_FILES:
+        return [item for f in files for item in load_one(f)]
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return [item for chunk in ex.map(load_one, files) for item in chunk]
+
+
+def _load_text_file(f, source):
+    text = _read_text(f)
+    if not text:
+        return []
+    return [{'data': {
+        'text': text,
+        'meta': {'filename': f.name, 'path': str(f.relative_to(source))},
+    }}]
 
 
 def load_text_files(source_dir, **kwargs):
     """Load plain text files from a directory. Each file becomes one item."""
-    items = []
     source = Path(source_dir)
-    for f in sorted(source.glob('**/*.txt')):
-        text = f.read_text(encoding='utf-8').strip()
-        if text:
-            items.append({
-                'text': text,
-                'meta': {'filename': f.name, 'path': str(f.relative_to(source))},
-            })
+    return _load_all(find_files(source, '.txt'), partial(_load_text_file, source=source))
+
+
+def _load_csv_file(f, text_column):
+    delimiter = '\t' if f.suffix == '.tsv' else ','
+    items = []
+    with open(f, encoding='utf-8') as fh:
+        reader = csv.DictReader(fh, delimiter=delimiter)
+        for row in reader:
+            text = row.get(text_column, '')
+            if text.strip():
+                meta = {k: v for k, v in row.items() if k != text_column}
+                meta['filename'] = f.name
+                items.append({'data': {'text': text.strip(), 'meta': meta}})
     return items
 
 
 def load_csv(source_dir, text_column='text', **kwargs):
     """Load CSV/TSV files. Each row becomes one item."""
-    items = []
     source = Path(source_dir)
-    for f in sorted(source.glob('**/*.csv')) + sorted(source.glob('**/*.tsv')):
-        delimiter = '\t' if f.suffix == '.tsv' else ','
-        with open(f, encoding='utf-8') as fh:
-            reader = csv.DictReader(fh, delimiter=delimiter)
-            for row in reader:
-                text = row.get(text_column, '')
-                if text.strip():
-                    meta = {k: v for k, v in row.items() if k != text_column}
-                    meta['filename'] = f.name
-                    items.append({'text': text.strip(), 'meta': meta})
+    return _load_all(find_files(source, ('.csv', '.tsv')), partial(_load_csv_file, text_column=text_column))
+
+
+def _iter_json(fh):
+    """Yield the items of a JSON file opened in binary mode.
+
+    A top-level array yields its elements (streamed with ijson when installed,
+    so the whole document is never held in memory); a top-level object is
+    yielded as-is; anything else yields nothing.
+
+    ijson's C backend rejects some numbers json accepts (integers past 64
+    bits, 1e400, NaN); the rest of such a file is parsed in one go instead.
+    """
+    skip = 0
+    if HAS_IJSON:
+        head = fh.read(64).lstrip(b'\xef\xbb\xbf \t\r\n')
+        fh.seek(0)
+        if head.startswith(b'['):
+            try:
+                for obj in ijson.items(fh, 'item', use_float=True):
+                    yield obj
+                    skip += 1
+                return
+            except (ijson.JSONError, OverflowError):
+                fh.seek(0)
+
+    data = _loads(fh.read())
+    if isinstance(data, list):
+        yield from data[skip:]
+    elif isinstance(data, dict):
+        yield data
+
+
+def _load_json_file(f, text_field):
+    items = []
+    with open(f, 'rb') as fh:
+        for obj in _iter_json(fh):
+            text = obj.get(text_field, '') if isinstance(obj, dict) else str(obj)
+            if text.strip():
+                meta = {k: v for k, v in obj.items() if k != text_field} if isinstance(obj, dict) else {}
+                meta['filename'] = f.name
+                items.append({'data': {'text': text.strip(), 'meta': meta}})
     return items
 
 
 def load_json(source_dir, text_field='text', **kwargs):
     """Load JSON files. Supports single objects, arrays, or one-object-per-file."""
-    items = []
     source = Path(source_dir)
-    for f in sorted(source.glob('**/*.json')):
-        with open(f, encoding='utf-8') as fh:
-            data = json.load(fh)
-        if isinstance(data, list):
-            for obj in data:
-                text = obj.get(text_field, '') if isinstance(obj, dict) else str(obj)
-                if text.strip():
-                    meta = {k: v for k, v in obj.items() if k != text_field} if isinstance(obj, dict) else {}
-                    meta['filename'] = f.name
-                    items.append({'text': text.strip(), 'meta': meta})
-        elif isinstance(data, dict):
-            text = data.get(text_field, '')
+    return _load_all(find_files(source, '.json'), partial(_load_json_file, text_field=text_field))
+
+
+def _load_jsonl_file(f, text_field):
+    items = []
+    with open(f, 'rb') as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            obj = _loads(line)
+            text = obj.get(text_field, '')
             if text.strip():
-                meta = {k: v for k, v in data.items() if k != text_field}
+                meta = {k: v for k, v in obj.items() if k != text_field}
                 meta['filename'] = f.name
-                items.append({'text': text.strip(), 'meta': meta})
+                items.append({'data': {'text': text.strip(), 'meta': meta}})
     return items
 
 
 def load_jsonl(source_dir, text_field='text', **kwargs):
     """Load JSONL files (one JSON object per line)."""
-    items = []
     source = Path(source_dir)
-    for f in sorted(source.glob('**/*.jsonl')):
-        with open(f, encoding='utf-8') as fh:
-            for line in fh:
-                line = line.strip()
-                if not line:
-                    continue
-                obj = json.loads(line)
-                text = obj.get(text_field, '')
-                if text.strip():
-                    meta = {k: v for k, v in obj.items() if k != text_field}
-                    meta['filename'] = f.name
-                    items.append({'text': text.strip(), 'meta': meta})
-    return items
+    return _load_all(find_files(source, '.jsonl'), partial(_load_jsonl_file, text_field=text_field))
 
 
 LOADERS = {
@@ -102,39 +278,38 @@ LOADERS = {
 }
 
 
+_PUNKT = None
+
+
+def _get_punkt():
+    """Load the English Punkt sentence tokenizer once per process."""
+    global _PUNKT
+    if _PUNKT is None:
+        import nltk
+        nltk.download('punkt_tab', quiet=True)
+        from nltk.tokenize.punkt import PunktTokenizer
+        _PUNKT = PunktTokenizer('english')
+    return _PUNKT
+
+
 def sentence_split(items):
-    """Split each item's text into sentences using NLTK."""
+    """Split each item's text into sentences using NLTK, in place.
+
+    The text becomes a list of {author, text} paragraphs, the format
+    Label Studio's <Paragraphs> tag expects.
+    """
     if not HAS_NLTK:
         print("ERROR: NLTK required for sentence splitting. Install: pip install nltk")
         sys.exit(1)
 
-    nltk.download('punkt_tab', quiet=True)
+    tokenizer = _get_punkt()
 
-    split_items = []
     for item in items:
-        sentences = nltk.sent_tokenize(item['text'])
-        paragraphs = [{"author": "", "text": s} for s in sentences]
-        split_items.append({
-            'text': paragraphs,
-            'meta': {**item.get('meta', {}), 'sentence_count': len(sentences)},
-        })
-    return split_items
-
-
-def format_for_label_studio(items, schema_type, granularity=None):
-    """Convert items to Label Studio import format.
-    
-    For sentence-level spans: text field is array of {author, text} objects.
-    For everything else: text field is a string.
-    """
-    ls_items = []
-    for item in items:
-        data = {'text': item['text']}
-        # Add metadata fields
-        if 'meta' in item:
-            data['meta'] = item['meta']
-        ls_items.append({'data': data})
-    return ls_items
+        data = item['data']
+        sentences = tokenizer.tokenize(data['text'])
+        data['text'] = [{"author": "", "text": s} for s in sentences]
+        data.setdefault('meta', {})['sentence_count'] = len(sentences)
+    return items
 
 
 def main():
@@ -142,9 +317,12 @@ def main():
     parser.add_argument('--config', required=True, help='Path to config.yaml')
     parser.add_argument('--input', help='Override input directory from config')
     parser.add_argument('--output', default='import.json', help='Output JSON file (default: import.json)')
+    parser.add_argument('--output-format', choices=['json', 'jsonl'], default='json',
+                        help='json: one indented array (default); jsonl: one task per line, written incrementally')
     parser.add_argument('--dry-run', action='store_true', help='Preview without writing')
     args = parser.parse_args()
 
+    import yaml
     try:
         with open(args.config) as f:
             config = yaml.safe_load(f)
@@ -160,7 +338,6 @@ def main():
         sys.exit(1)
 
     data_config = config.get('data', {})
-    schema_config = config.get('schema', {})
 
     # Determine source
     source = args.input or data_config.get('source', './data/')
@@ -183,54 +360,66 @@ def main():
     # Filtering
     min_len = data_config.get('min_length')
     max_len = data_config.get('max_length')
-    if min_len:
-        items = [i for i in items if len(i['text']) >= min_len]
-        print(f"  After min_length filter: {len(items)}")
-    if max_len:
-        items = [i for i in items if len(i['text']) <= max_len]
-        print(f"  After max_length filter: {len(items)}")
+    if min_len or max_len:
+        # Single pass for both bounds; count min_length survivors on the way
+        lo = min_len or 0
+        hi = max_len or float('inf')
+        kept = []
+        after_min = 0
+        for i in items:
+            n = len(i['data']['text'])
+            if n >= lo:
+                after_min += 1
+                if n <= hi:
+                    kept.append(i)
+        items = kept
+        if min_len:
+            print(f"  After min_length filter: {after_min}")
+        if max_len:
+            print(f"  After max_length filter: {len(items)}")
+
+    # One seeded generator for the whole run; leaves the global RNG untouched
+    shuffle = data_config.get('shuffle', False)
+    seed = data_config.get('shuffle_seed', 42)
+    rng = random.Random(seed)
+    shuffled = False
 
     max_items = data_config.get('max_items')
     if max_items and len(items) > max_items:
-        # If shuffling, shuffle first then truncate; otherwise take first N
-        if data_config.get('shuffle', False):
-            seed = data_config.get('shuffle_seed', 42)
-            random.seed(seed)
-            random.shuffle(items)
-        items = items[:max_items]
+        # If shuffling, draw a random sample (already in random order);
+        # otherwise take first N
+        if shuffle:
+            items = rng.sample(items, max_items)
+            shuffled = True
+        else:
+            items = items[:max_items]
         print(f"  Truncated to {len(items)} items")
 
     # Sentence splitting (for sentence-level span tasks)
     if data_config.get('sentence_split', False):
         print("  Splitting into sentences...")
         items = sentence_split(items)
-        total_sents = sum(len(i['text']) for i in items if isinstance(i['text'], list))
+        total_sents = sum(len(i['data']['text']) for i in items if isinstance(i['data']['text'], list))
         print(f"  {total_sents} total sentences across {len(items)} items")
 
     # Shuffling (if not already done above)
-    if data_config.get('shuffle', False) and max_items is None:
-        seed = data_config.get('shuffle_seed', 42)
-        random.seed(seed)
-        random.shuffle(items)
+    if shuffle and not shuffled:
+        rng.shuffle(items)
         print(f"  Shuffled (seed={seed})")
 
-    # Format for Label Studio
-    ls_data = format_for_label_studio(
-        items,
-        schema_type=schema_config.get('type', 'span'),
-        granularity=schema_config.get('granularity'),
-    )
-
     if args.dry_run:
-        print(f"\n  Would write {len(ls_data)} tasks to {args.output}")
-        if ls_data:
-            print(f"  Sample item: {json.dumps(ls_data[0], indent=2)[:500]}")
+        print(f"\n  Would write {len(items)} tasks to {args.output}")
+        if items:
+            print(f"  Sample item: {json.dumps(items[0], indent=2)[:500]}")
         return
 
-    with open(args.output, 'w', encoding='utf-8') as f:
-        json.dump(ls_data, f, ensure_ascii=False, indent=2)
+    with open(args.output, 'wb') as f:
+        if args.output_format == 'jsonl':
+            f.writelines(map(_dumps_line, items))
+        else:
+            f.write(_dumps(items))
 
-    print(f"\n  ✓ Wrote {len(ls_data)} tasks to {args.output}")
+    print(f"\n  ✓ Wrote {len(items)} tasks to {args.output}")
     print(f"  Import into Label Studio: curl -X POST 'https://your-server/api/projects/ID/import' ...")
 
 
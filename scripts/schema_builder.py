@@ -7,9 +7,19 @@ Supports:
 - ner (named entity recognition)
 - pairwise (compare two texts)
 """
+import json
 import sys
+from functools import lru_cache
+from itertools import cycle
+
 import yaml
-from xml.sax.saxutils import escape
+
+# libyaml-backed loader when PyYAML was built with it, pure Python otherwise
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Attribute-value escaping in one C-level pass (saxutils.escape does three
+# replace() passes and leaves double quotes alone)
+_XML_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
 
 # Default color palette (Label Studio friendly)
 DEFAULT_COLORS = [
@@ -20,123 +30,150 @@ DEFAULT_COLORS = [
 ]
 
 
+def _label_key(labels):
+    """Freeze label definitions into a hashable tuple of (name, color, hotkey).
+
+    color and hotkey are kept as the strings they render to, so values that
+    compare equal but print differently (1, 1.0, True) get distinct cache
+    keys, and unhashable YAML values still build. color is None when unset.
+    """
+    return tuple(
+        (label['name'],
+         str(label['color']) if 'color' in label else None,
+         str(label['hotkey']) if label.get('hotkey') else '')
+        for label in labels
+    )
+
+
+def _label_fields(label_key):
+    """Normalize a _label_key() tuple into (escaped name, color, hotkey attribute) tuples.
+
+    This is the only place labels are escaped; the builders below take the
+    resulting list so each label is processed once per schema.
+    """
+    fields = []
+    table = _XML_TABLE
+    # The i-th label defaults to the i-th palette color, wrapping around
+    for (name, color, hotkey), default in zip(label_key, cycle(DEFAULT_COLORS)):
+        hotkey_attr = f' hotkey="{hotkey.translate(table)}"' if hotkey else ''
+        if color is None:
+            color = default
+        fields.append((name.translate(table), color, hotkey_attr))
+    return fields
+
+
+def _label_lines(fields, tag_name):
+    return (f'    <{tag_name} value="{name}" background="{color}"{hotkey}/>'
+            for name, color, hotkey in fields)
+
+
 def build_label_xml(labels, tag_name="Label"):
     """Build XML for a list of label definitions."""
-    parts = []
-    for i, label in enumerate(labels):
-        name = label['name']
-        color = label.get('color', DEFAULT_COLORS[i % len(DEFAULT_COLORS)])
-        hotkey = label.get('hotkey', '')
-        attrs = f'value="{escape(name)}" background="{color}"'
-        if hotkey:
-            attrs += f' hotkey="{escape(str(hotkey))}"'
-        parts.append(f'    <{tag_name} {attrs}/>')
-    return '\n'.join(parts)
-
-
-def build_span_sentence(labels):
+    return '\n'.join(_label_lines(_label_fields(_label_key(labels)), tag_name))
+
+
+def _choice_lines(fields):
+    """<Choice> lines from _label_fields() output (no colors)."""
+    return (f'    <Choice value="{name}"{hotkey}/>' for name, _, hotkey in fields)
+
+
+def _emit(pre, lines, post, write):
+    """Return pre + newline-joined lines + post, or stream them through write().
+
+    With a write callable nothing is accumulated: each piece is written as it
+    is produced and None is returned.
+    """
+    if write is None:
+        return pre + '\n'.join(lines) + post
+    write(pre)
+    sep = ''
+    for line in lines:
+        write(sep)
+        write(line)
+        sep = '\n'
+    write(post)
+
+
+_SPAN_SENTENCE_PRE = """<View>
+  <ParagraphLabels name="labels" toName="text">
+"""
+_SPAN_SENTENCE_POST = """
+  </ParagraphLabels>
+  <Paragraphs name="text" value="$text" layout="dialogue" />
+</View>"""
+
+
+def build_span_sentence(fields, write=None):
     """Span labeling on sentence-level paragraphs.
     
     Uses <ParagraphLabels> + <Paragraphs>.
     Data format: {"text": [{"author": "", "text": "sentence"}, ...]}
     """
-    label_xml = build_label_xml(labels, "Label")
-    return f"""<View>
-  <ParagraphLabels name="labels" toName="text">
-{label_xml}
-  </ParagraphLabels>
-  <Paragraphs name="text" value="$text" layout="dialogue" />
+    return _emit(_SPAN_SENTENCE_PRE, _label_lines(fields, "Label"), _SPAN_SENTENCE_POST, write)
+
+
+_SPAN_CHARACTER_PRE = """<View>
+  <Labels name="labels" toName="text">
+"""
+_SPAN_CHARACTER_POST = """
+  </Labels>
+  <Text name="text" value="$text" />
 </View>"""
 
 
-def build_span_character(labels):
+def build_span_character(fields, write=None):
     """Span labeling on character level (highlight arbitrary spans).
     
     Uses <Labels> + <Text>.
     Data format: {"text": "full text here"}
     """
-    label_xml = build_label_xml(labels, "Label")
-    return f"""<View>
-  <Labels name="labels" toName="text">
-{label_xml}
-  </Labels>
+    return _emit(_SPAN_CHARACTER_PRE, _label_lines(fields, "Label"), _SPAN_CHARACTER_POST, write)
+
+
+_CLASSIFICATION_SINGLE_PRE = """<View>
+  <Choices name="label" toName="text" choice="single" showInline="true">
+"""
+_CLASSIFICATION_SINGLE_POST = """
+  </Choices>
   <Text name="text" value="$text" />
 </View>"""
 
 
-def build_classification_single(labels):
+def build_classification_single(fields, write=None):
     """Single-label document classification.
     
     Uses <Choices> + <Text>.
     Data format: {"text": "document text"}
     """
-    label_xml = build_label_xml(labels, "Choice").replace("background=", "html=")
-    # Choices use different attributes
-    parts = []
-    for i, label in enumerate(labels):
-        name = label['name']
-        hotkey = label.get('hotkey', '')
-        attrs = f'value="{escape(name)}"'
-        if hotkey:
-            attrs += f' hotkey="{escape(str(hotkey))}"'
-        parts.append(f'    <Choice {attrs}/>')
-    choices_xml = '\n'.join(parts)
-
-    return f"""<View>
-  <Choices name="label" toName="text" choice="single" showInline="true">
-{choices_xml}
+    return _emit(_CLASSIFICATION_SINGLE_PRE, _choice_lines(fields), _CLASSIFICATION_SINGLE_POST, write)
+
+
+_CLASSIFICATION_MULTI_PRE = """<View>
+  <Choices name="labels" toName="text" choice="multiple" showInline="true">
+"""
+_CLASSIFICATION_MULTI_POST = """
   </Choices>
   <Text name="text" value="$text" />
 </View>"""
 
 
-def build_classification_multi(labels):
+def build_classification_multi(fields, write=None):
     """Multi-label document classification.
     
     Same as single but with choice="multiple".
     """
-    parts = []
-    for i, label in enumerate(labels):
-        name = label['name']
-        hotkey = label.get('hotkey', '')
-        attrs = f'value="{escape(name)}"'
-        if hotkey:
-            attrs += f' hotkey="{escape(str(hotkey))}"'
-        parts.append(f'    <Choice {attrs}/>')
-    choices_xml = '\n'.join(parts)
-
-    return f"""<View>
-  <Choices name="labels" toName="text" choice="multiple" showInline="true">
-{choices_xml}
-  </Choices>
-  <Text name="text" value="$text" />
-</View>"""
+    return _emit(_CLASSIFICATION_MULTI_PRE, _choice_lines(fields), _CLASSIFICATION_MULTI_POST, write)
 
 
-def build_ner(labels):
+def build_ner(fields, write=None):
     """Named entity recognition (token-level spans).
     
     Uses <Labels> + <Text>. Same XML as character spans but semantically for entities.
     """
-    return build_span_character(labels)
+    return build_span_character(fields, write)
 
 
-def build_pairwise(labels):
-    """Pairwise comparison — annotator chooses which of two texts fits a criterion.
-    
-    Data format: {"text_a": "first text", "text_b": "second text"}
-    """
-    parts = []
-    for label in labels:
-        name = label['name']
-        hotkey = label.get('hotkey', '')
-        attrs = f'value="{escape(name)}"'
-        if hotkey:
-            attrs += f' hotkey="{escape(str(hotkey))}"'
-        parts.append(f'    <Choice {attrs}/>')
-    choices_xml = '\n'.join(parts)
-
-    return f"""<View>
+_PAIRWISE_PRE = """<View>
   <View style="display:flex;gap:20px">
     <View style="flex:1">
       <Header value="Text A" />
@@ -148,12 +185,22 @@ def build_pairwise(labels):
     </View>
   </View>
   <Choices name="label" toName="text_a" choice="single" showInline="true">
-{choices_xml}
+"""
+_PAIRWISE_POST = """
   </Choices>
 </View>"""
 
 
-# Map of (type, granularity) → builder function
+def build_pairwise(fields, write=None):
+    """Pairwise comparison — annotator chooses which of two texts fits a criterion.
+    
+    Data format: {"text_a": "first text", "text_b": "second text"}
+    """
+    return _emit(_PAIRWISE_PRE, _choice_lines(fields), _PAIRWISE_POST, write)
+
+
+# Map of (type, granularity) → builder function. Builders take _label_fields()
+# output and an optional write callable (see _emit).
 BUILDERS = {
     ('span', 'sentence'): build_span_sentence,
     ('span', 'character'): build_span_character,
@@ -163,18 +210,23 @@ BUILDERS = {
     ('pairwise', None): build_pairwise,
 }
 
+# Types whose builder ignores granularity
+_UNGRANULAR = frozenset(t for t, g in BUILDERS if g is None)
+
 
-def build_schema(config):
+def build_schema(config, write=None):
     """Build Label Studio XML from a schema config dict.
     
     Args:
         config: dict with keys: type, granularity (optional), labels
+        write: optional callable (e.g. sys.stdout.write) to stream the XML to
         
     Returns:
-        Label Studio XML string
+        Label Studio XML string, or None when streaming through write
     """
-    schema_type = config['type'].lower()
-    granularity = config.get('granularity', '').lower() or None
+    # BUILDERS keys are interned literals, so interning the lowered type lets
+    # the dispatch and cache lookups compare by identity
+    schema_type = sys.intern(config['type'].lower())
     labels = config['labels']
 
     # Handle classification subtypes
@@ -183,26 +235,47 @@ def build_schema(config):
         if multi:
             schema_type = 'classification_multi'
 
+    # Normalize granularity up front so dispatch is a single exact lookup
+    if schema_type in _UNGRANULAR:
+        granularity = None
+    else:
+        granularity = sys.intern(config.get('granularity', '').lower()) or None
+
     if not labels:
         raise ValueError("Schema must have at least one label")
 
-    key = (schema_type, granularity)
+    label_key = _label_key(labels)
+    if write is None:
+        return _build_schema_cached(schema_type, granularity, label_key)
+    _get_builder(schema_type, granularity)(_label_fields(label_key), write)
 
-    # Try exact match first, then without granularity
-    builder = BUILDERS.get(key) or BUILDERS.get((schema_type, None))
 
-    if not builder:
+def _get_builder(schema_type, granularity):
+    builder = BUILDERS.get((schema_type, granularity))
+    if builder is None:
+        # Only built on the error path
         supported = ', '.join(f"{t}({g})" if g else t for t, g in BUILDERS.keys())
         raise ValueError(f"Unsupported schema type: {schema_type}/{granularity}. Supported: {supported}")
+    return builder
+
 
-    return builder(labels)
+@lru_cache(maxsize=128)
+def _build_schema_cached(schema_type, granularity, label_key):
+    """Build the XML for a normalized config; repeat configs hit the cache."""
+    return _get_builder(schema_type, granularity)(_label_fields(label_key))
 
 
-def from_yaml_file(path):
-    """Load config from YAML file and build schema."""
-    with open(path) as f:
-        config = yaml.safe_load(f)
-    return build_schema(config['schema'])
+def from_yaml_file(path, write=None):
+    """Load config from YAML file and build schema (see build_schema for write)."""
+    # Hand the parsers raw bytes; both detect the encoding themselves
+    with open(path, 'rb') as f:
+        data = f.read()
+    # JSON is valid YAML and the C json parser is much faster, so try it first
+    try:
+        config = json.loads(data)
+    except ValueError:
+        config = yaml.load(data, Loader=_YAML_LOADER)
+    return build_schema(config['schema'], write)
 
 
 if __name__ == '__main__':
@@ -211,5 +284,5 @@ if __name__ == '__main__':
         print("       Outputs Label Studio XML to stdout")
         sys.exit(1)
 
-    xml = from_yaml_file(sys.argv[1])
-    print(xml)
+    from_yaml_file(sys.argv[1], write=sys.stdout.write)
+    sys.stdout.write('\n')
@@ -5,27 +5,54 @@ Interactive CLI that walks you through configuring your annotation project.
 Generates config.yaml, Label Studio XML, docker-compose.yaml, and optionally
 OpenClaw agent workspace files.
 """
+import argparse
+import importlib.util
 import os
+import re
 import sys
 import json
-import random
+import secrets
 import string
+from functools import lru_cache
+from itertools import cycle
 from pathlib import Path
+from string import Template
 
-# Schema builder import
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
-from schema_builder import build_schema
+import yaml
+
+# Paths are resolved against this file so the wizard works from any cwd
+_HERE = Path(__file__).resolve().parent
+_SOUL_TEMPLATE = (_HERE / 'templates' / 'agent' / 'SOUL.md').read_text(encoding='utf-8')
+
+# libyaml-backed dumper when PyYAML was built with it, pure Python otherwise
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
 # ─── Colors & formatting ────────────────────────────────────────────────────
 
-BOLD = '\033[1m'
-DIM = '\033[2m'
-GREEN = '\033[92m'
-CYAN = '\033[96m'
-YELLOW = '\033[93m'
-RED = '\033[91m'
-RESET = '\033[0m'
-PINK = '\033[95m'
+# https://no-color.org: any non-empty NO_COLOR disables ANSI styling
+if os.environ.get('NO_COLOR'):
+    BOLD = DIM = GREEN = CYAN = YELLOW = RED = RESET = PINK = ''
+else:
+    BOLD = '\033[1m'
+    DIM = '\033[2m'
+    GREEN = '\033[92m'
+    CYAN = '\033[96m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    RESET = '\033[0m'
+    PINK = '\033[95m'
+
+# Styled fragments used on every prompt, built once
+_SECTION = f"\n{BOLD}{CYAN}── {{}} ──{RESET}\n"
+_SUCCESS = f"  {GREEN}✓{RESET} "
+_WARN = f"  {YELLOW}⚠{RESET} "
+_INFO = f"  {DIM}{{}}{RESET}"
+_DEFAULT_HINT = f" {DIM}[{{}}]{RESET}: "
+_MARKER_SEL = f"{CYAN}▸{RESET}"
+_MARKER_UNSEL = " "
+_OPTION_DESC = f" — {DIM}{{}}{RESET}"
+_CHOOSE_PROMPT = f"  {DIM}Choose [1-{{n}}] (default {{default}}):{RESET} "
+_BAD_CHOICE = f"  {RED}Please enter a number 1-{{n}}{RESET}"
 
 def banner():
     print(f"""
@@ -35,55 +62,126 @@ def banner():
 """)
 
 def section(title):
-    print(f"\n{BOLD}{CYAN}── {title} ──{RESET}\n")
+    print(_SECTION.format(title))
 
 def success(msg):
-    print(f"  {GREEN}✓{RESET} {msg}")
+    print(_SUCCESS + msg)
 
 def warn(msg):
-    print(f"  {YELLOW}⚠{RESET} {msg}")
+    print(_WARN + msg)
 
 def info(msg):
-    print(f"  {DIM}{msg}{RESET}")
-
-def ask(prompt, default=None):
+    print(_INFO.format(msg))
+
+# Scripted runs (setup.py < answers.txt) read stdin through its buffer rather
+# than input(), which flushes both std streams on every call
+_PIPED = not sys.stdin.isatty()
+
+def _read_line(prompt):
+    """Prompt and read one line of input, without the trailing newline."""
+    if not _PIPED:
+        return input(prompt)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\n')
+
+# Pre-filled answers from --answers, looked up by each question's key. With
+# --non-interactive, questions without an answer take their default.
+_ANSWERS = {}
+_NON_INTERACTIVE = False
+_MISSING = object()
+
+def _preset(key):
+    """Pre-filled answer for key, or _MISSING if the question should be asked."""
+    if key is None:
+        return _MISSING
+    return _ANSWERS.get(key, _MISSING)
+
+def ask(prompt, default=None, key=None):
     """Ask a question with optional default."""
-    if default:
-        prompt_str = f"  {prompt} {DIM}[{default}]{RESET}: "
+    preset = _preset(key)
+    if preset is not _MISSING:
+        answer = '' if preset is None else str(preset).strip()
+    elif _NON_INTERACTIVE:
+        return default
     else:
-        prompt_str = f"  {prompt}: "
-    answer = input(prompt_str).strip()
+        if default:
+            prompt_str = "  " + prompt + _DEFAULT_HINT.format(default)
+        else:
+            prompt_str = "  " + prompt + ": "
+        answer = _read_line(prompt_str).strip()
     return answer if answer else default
 
-def choose(prompt, options, default=1):
-    """Multiple choice question. Returns (index, label)."""
+@lru_cache(maxsize=None)
+def _menu(options, default):
+    """Render the option list for choose(); options must be a tuple."""
+    return '\n'.join(
+        f"  {_MARKER_SEL if i == default else _MARKER_UNSEL} [{i}] {label}"
+        f"{_OPTION_DESC.format(desc) if desc else ''}"
+        for i, (label, desc) in enumerate(options, 1)
+    )
+
+def choose(prompt, options, default=1, key=None):
+    """Multiple choice question. Returns the 1-based index of the chosen option."""
+    preset = _preset(key)
+    if preset is _MISSING and _NON_INTERACTIVE:
+        preset = default
+    if preset is not _MISSING:
+        if isinstance(preset, str) and preset.strip().isdecimal():
+            preset = int(preset)  # quoted numbers, e.g. deploy: "2"
+        if isinstance(preset, bool) or not isinstance(preset, int) or not 1 <= preset <= len(options):
+            sys.exit(f"Invalid answer for {key!r}: expected a number 1-{len(options)}, got {preset!r}")
+        return preset
+
     print(f"  {prompt}")
-    for i, (label, desc) in enumerate(options, 1):
-        marker = f"{CYAN}▸{RESET}" if i == default else " "
-        print(f"  {marker} [{i}] {label}{f' — {DIM}{desc}{RESET}' if desc else ''}")
+    print(_menu(options, default))
+    choose_prompt = _CHOOSE_PROMPT.format(n=len(options), default=default)
     while True:
-        choice = input(f"  {DIM}Choose [1-{len(options)}] (default {default}):{RESET} ").strip()
+        choice = _read_line(choose_prompt).strip()
         if not choice:
             choice = str(default)
         try:
             idx = int(choice)
             if 1 <= idx <= len(options):
-                return idx, options[idx - 1][0]
+                return idx
         except ValueError:
             pass
-        print(f"  {RED}Please enter a number 1-{len(options)}{RESET}")
+        print(_BAD_CHOICE.format(n=len(options)))
 
-def confirm(prompt, default=True):
+def confirm(prompt, default=True, key=None):
     """Yes/no question."""
+    preset = _preset(key)
+    if preset is _MISSING and _NON_INTERACTIVE:
+        return default
+    if preset is not _MISSING and not isinstance(preset, str):
+        return default if preset is None else bool(preset)
+    if isinstance(preset, str):
+        answer = preset.strip().lower()
+        return answer in ('y', 'yes') if answer else default
+
     hint = "Y/n" if default else "y/N"
-    answer = input(f"  {prompt} [{hint}]: ").strip().lower()
+    answer = _read_line(f"  {prompt} [{hint}]: ").strip().lower()
     if not answer:
         return default
     return answer in ('y', 'yes')
 
+def _load_schema_builder():
+    """Import scripts/schema_builder.py on demand, without touching sys.path."""
+    path = _HERE / 'scripts' / 'schema_builder.py'
+    spec = importlib.util.spec_from_file_location('schema_builder', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+_PW_ALPHABET = string.ascii_letters + string.digits
+_SYSTEM_RANDOM = secrets.SystemRandom()
+
 def random_password(length=16):
-    chars = string.ascii_letters + string.digits
-    return ''.join(random.choice(chars) for _ in range(length))
+    """Alphanumeric password from the OS CSPRNG (these end up in .env)."""
+    return ''.join(_SYSTEM_RANDOM.choices(_PW_ALPHABET, k=length))
 
 
 # ─── Default color palette ───────────────────────────────────────────────────
@@ -95,6 +193,57 @@ COLORS = [
 ]
 
 
+# One comma-separated label, trimmed of surrounding whitespace
+_LABEL_TOKEN = re.compile(r'[^,\s](?:[^,]*[^,\s])?')
+
+
+# ─── Wizard options ──────────────────────────────────────────────────────────
+# (label, description) pairs for each choose() question
+
+_DEPLOY_OPTS = (
+    ("Local Docker", "docker compose up on this machine"),
+    ("Remote server", "VPS or cloud server with a public IP"),
+    ("Config only", "just generate files, I'll deploy myself"),
+)
+
+_DOMAIN_OPTS = (
+    ("Free DuckDNS subdomain", "e.g. my-project.duckdns.org"),
+    ("I have a domain", "e.g. annotations.example.com"),
+    ("Localhost only", "no public access, no TLS"),
+)
+
+_TASK_OPTS = (
+    ("Span labeling", "highlight text and assign a label (NER, rhetoric, etc.)"),
+    ("Document classification", "assign one or more labels to a whole document"),
+    ("Named entity recognition", "label entities in text (people, places, etc.)"),
+    ("Pairwise comparison", "compare two texts and choose one"),
+)
+
+_GRAN_OPTS = (
+    ("Sentence-level", "click a sentence to label it — great for discourse/rhetoric"),
+    ("Character-level", "highlight any span of text — more flexible, more work"),
+)
+
+_ML_OPTS = (
+    ("Single label", "each document gets exactly one label"),
+    ("Multi-label", "each document can get multiple labels"),
+)
+
+_FMT_OPTS = (
+    ("Plain text files", ".txt files, one document per file"),
+    ("CSV / TSV", "spreadsheet format with a text column"),
+    ("JSON", "JSON files with a text field"),
+    ("JSONL", "one JSON object per line"),
+    ("I'll import later", "skip data setup for now"),
+)
+
+_EXPORT_OPTS = (
+    ("Daily", "once a day, versioned in git"),
+    ("Hourly", "every hour"),
+    ("Manual only", "I'll run exports myself"),
+)
+
+
 # ─── Main wizard ─────────────────────────────────────────────────────────────
 
 def run_wizard():
@@ -105,17 +254,13 @@ def run_wizard():
     # ── Project info ──
     section("Project")
     config['project'] = {
-        'name': ask("Project name", "My Annotation Project"),
-        'description': ask("Short description", ""),
+        'name': ask("Project name", "My Annotation Project", key='project_name'),
+        'description': ask("Short description", "", key='description'),
     }
 
     # ── Deployment ──
     section("Deployment")
-    deploy_idx, deploy_choice = choose("Where will this run?", [
-        ("Local Docker", "docker compose up on this machine"),
-        ("Remote server", "VPS or cloud server with a public IP"),
-        ("Config only", "just generate files, I'll deploy myself"),
-    ])
+    deploy_idx = choose("Where will this run?", _DEPLOY_OPTS, key='deploy')
     config['_deploy'] = deploy_idx
 
     # ── Domain ──
@@ -123,22 +268,18 @@ def run_wizard():
 
     if deploy_idx in (1, 2):
         section("Domain & TLS")
-        domain_idx, _ = choose("How should people reach your server?", [
-            ("Free DuckDNS subdomain", "e.g. my-project.duckdns.org"),
-            ("I have a domain", "e.g. annotations.example.com"),
-            ("Localhost only", "no public access, no TLS"),
-        ])
+        domain_idx = choose("How should people reach your server?", _DOMAIN_OPTS, key='domain_mode')
 
         if domain_idx == 1:
-            subdomain = ask("DuckDNS subdomain (without .duckdns.org)")
-            token = ask("DuckDNS token (from duckdns.org/install.jsp)")
+            subdomain = ask("DuckDNS subdomain (without .duckdns.org)", key='duckdns_subdomain')
+            token = ask("DuckDNS token (from duckdns.org/install.jsp)", key='duckdns_token')
             config['server']['duckdns'] = {
                 'subdomain': subdomain or 'my-project',
                 'token': token or 'YOUR_DUCKDNS_TOKEN',
             }
             config['_domain'] = f"{config['server']['duckdns']['subdomain']}.duckdns.org"
         elif domain_idx == 2:
-            domain = ask("Your domain name")
+            domain = ask("Your domain name", key='domain')
             config['server']['domain'] = domain or 'annotations.example.com'
             config['_domain'] = config['server']['domain']
         else:
@@ -147,8 +288,8 @@ def run_wizard():
     # ── Admin account ──
     section("Admin Account")
     info("This creates the first Label Studio user (project admin).")
-    admin_email = ask("Admin email")
-    admin_pass = ask("Admin password (leave blank to auto-generate)")
+    admin_email = ask("Admin email", key='admin_email')
+    admin_pass = ask("Admin password (leave blank to auto-generate)", key='admin_password')
     if not admin_pass:
         admin_pass = random_password()
         info(f"Generated password: {admin_pass}")
@@ -161,12 +302,19 @@ def run_wizard():
     section("Team")
     team = [{'name': 'Admin', 'email': config['server']['admin']['email'], 'role': 'admin'}]
     info("Add team members who will annotate. They'll create their own accounts at the URL.")
-    while True:
-        name = ask("Team member name (blank to finish)")
-        if not name:
-            break
-        email = ask(f"  {name}'s email")
-        team.append({'name': name, 'email': email or ''})
+    if 'team' in _ANSWERS or _NON_INTERACTIVE:
+        members = _ANSWERS.get('team') or []
+        if not isinstance(members, list) or not all(isinstance(m, dict) and m.get('name') for m in members):
+            sys.exit(f"Invalid answer for 'team': expected a list of {{name, email}} mappings, got {members!r}")
+        for member in members:
+            team.append({'name': member['name'], 'email': member.get('email') or ''})
+    else:
+        while True:
+            name = ask("Team member name (blank to finish)")
+            if not name:
+                break
+            email = ask(f"  {name}'s email")
+            team.append({'name': name, 'email': email or ''})
     config['team'] = team
     if len(team) > 1:
         success(f"{len(team)} team members ({', '.join(t['name'] for t in team)})")
@@ -176,48 +324,38 @@ def run_wizard():
     # ── Annotation schema ──
     section("Annotation Schema")
 
-    task_idx, task_choice = choose("What type of annotation?", [
-        ("Span labeling", "highlight text and assign a label (NER, rhetoric, etc.)"),
-        ("Document classification", "assign one or more labels to a whole document"),
-        ("Named entity recognition", "label entities in text (people, places, etc.)"),
-        ("Pairwise comparison", "compare two texts and choose one"),
-    ])
+    task_idx = choose("What type of annotation?", _TASK_OPTS, key='task_type')
 
     schema_type_map = {1: 'span', 2: 'classification', 3: 'ner', 4: 'pairwise'}
     schema_type = schema_type_map[task_idx]
     granularity = None
 
     if schema_type == 'span':
-        gran_idx, _ = choose("Granularity?", [
-            ("Sentence-level", "click a sentence to label it — great for discourse/rhetoric"),
-            ("Character-level", "highlight any span of text — more flexible, more work"),
-        ])
+        gran_idx = choose("Granularity?", _GRAN_OPTS, key='granularity')
         granularity = 'sentence' if gran_idx == 1 else 'character'
 
     multi_label = False
     if schema_type == 'classification':
-        ml_idx, _ = choose("Classification mode?", [
-            ("Single label", "each document gets exactly one label"),
-            ("Multi-label", "each document can get multiple labels"),
-        ])
+        ml_idx = choose("Classification mode?", _ML_OPTS, key='classification_mode')
         multi_label = (ml_idx == 2)
 
     # Labels
     print()
     info("Define your labels. Enter them comma-separated.")
     info("Example: METAPHOR, IRONY, REPETITION, NONE, UNCERTAIN")
-    label_input = ask("Labels")
-
-    labels = []
-    if label_input:
-        for i, name in enumerate(label_input.split(',')):
-            name = name.strip().upper()
-            if name:
-                labels.append({
-                    'name': name,
-                    'hotkey': str(i + 1) if i < 9 else '',
-                    'color': COLORS[i % len(COLORS)],
-                })
+    label_input = _ANSWERS.get('labels')
+    if isinstance(label_input, list):
+        label_input = ','.join(map(str, label_input))
+    else:
+        label_input = ask("Labels", key='labels')
+
+    names = [name.upper() for name in _LABEL_TOKEN.findall(label_input or '')]
+    if names:
+        # Hotkeys 1-9 for the first nine labels; colors wrap around the palette
+        labels = [
+            {'name': name, 'hotkey': str(i) if i <= 9 else '', 'color': color}
+            for i, (name, color) in enumerate(zip(names, cycle(COLORS)), 1)
+        ]
     else:
         # Default labels
         labels = [
@@ -228,7 +366,15 @@ def run_wizard():
         info("Using default labels: POSITIVE, NEGATIVE, NEUTRAL")
 
     # Add descriptions
-    if confirm("Add descriptions to each label?", default=False):
+    descriptions = _ANSWERS.get('label_descriptions')
+    if descriptions is not None:
+        if not isinstance(descriptions, dict):
+            sys.exit(f"Invalid answer for 'label_descriptions': expected a mapping of label name "
+                     f"to description, got {descriptions!r}")
+        for label in labels:
+            if descriptions.get(label['name']):
+                label['description'] = descriptions[label['name']]
+    elif confirm("Add descriptions to each label?", default=False, key='describe_labels'):
         for label in labels:
             desc = ask(f"  Description for {label['name']}")
             if desc:
@@ -244,11 +390,8 @@ def run_wizard():
         config['schema']['multi_label'] = True
 
     # Max annotations
-    max_ann = ask("Max annotations per item (for agreement, usually 1-3)", "1")
-    try:
-        config['schema']['max_annotations'] = int(max_ann)
-    except:
-        config['schema']['max_annotations'] = 1
+    max_ann = ask("Max annotations per item (for agreement, usually 1-3)", "1", key='max_annotations')
+    config['schema']['max_annotations'] = int(max_ann) if max_ann and max_ann.isdecimal() else 1
 
     success(f"Schema: {schema_type}" + (f" ({granularity})" if granularity else "") +
             f" with {len(labels)} labels")
@@ -256,13 +399,7 @@ def run_wizard():
     # ── Data ──
     section("Data")
 
-    fmt_idx, fmt_choice = choose("What format is your data in?", [
-        ("Plain text files", ".txt files, one document per file"),
-        ("CSV / TSV", "spreadsheet format with a text column"),
-        ("JSON", "JSON files with a text field"),
-        ("JSONL", "one JSON object per line"),
-        ("I'll import later", "skip data setup for now"),
-    ])
+    fmt_idx = choose("What format is your data in?", _FMT_OPTS, key='data_format')
 
     fmt_map = {1: 'text', 2: 'csv', 3: 'json', 4: 'jsonl', 5: None}
     data_fmt = fmt_map[fmt_idx]
@@ -270,48 +407,41 @@ def run_wizard():
     config['data'] = {}
     if data_fmt:
         config['data']['format'] = data_fmt
-        config['data']['source'] = ask("Data directory", "./data/")
+        config['data']['source'] = ask("Data directory", "./data/", key='data_source')
 
         if schema_type == 'span' and granularity == 'sentence':
-            config['data']['sentence_split'] = confirm("Auto-split text into sentences?", default=True)
+            config['data']['sentence_split'] = confirm("Auto-split text into sentences?", default=True, key='sentence_split')
 
-        config['data']['shuffle'] = confirm("Randomize order? (prevents annotation bias)", default=True)
+        config['data']['shuffle'] = confirm("Randomize order? (prevents annotation bias)", default=True, key='shuffle')
         if config['data']['shuffle']:
             config['data']['shuffle_seed'] = 42
 
-        max_items = ask("Max items to import (blank for all)")
-        if max_items:
-            try:
-                config['data']['max_items'] = int(max_items)
-            except:
-                pass
+        max_items = ask("Max items to import (blank for all)", key='max_items')
+        if max_items and max_items.isdecimal():
+            config['data']['max_items'] = int(max_items)
 
     # ── Export ──
     section("Automated Exports")
     info("Auto-export annotations to git on a schedule.")
 
-    export_idx, _ = choose("Export schedule?", [
-        ("Daily", "once a day, versioned in git"),
-        ("Hourly", "every hour"),
-        ("Manual only", "I'll run exports myself"),
-    ])
+    export_idx = choose("Export schedule?", _EXPORT_OPTS, key='export_schedule')
 
     schedule_map = {1: 'daily', 2: 'hourly', 3: 'manual'}
     config['export'] = {'schedule': schedule_map[export_idx], 'format': 'json'}
 
     if export_idx == 1:
-        config['export']['time'] = ask("Export time (24h format)", "22:00")
-        config['export']['timezone'] = ask("Timezone", "America/New_York")
+        config['export']['time'] = ask("Export time (24h format)", "22:00", key='export_time')
+        config['export']['timezone'] = ask("Timezone", "America/New_York", key='timezone')
 
-    config['export']['git'] = {'enabled': confirm("Enable git commits?", default=True)}
+    config['export']['git'] = {'enabled': confirm("Enable git commits?", default=True, key='git')}
     if config['export']['git']['enabled']:
-        config['export']['git']['push'] = confirm("Auto-push to remote?", default=False)
+        config['export']['git']['push'] = confirm("Auto-push to remote?", default=False, key='git_push')
 
     # ── Guidelines ──
     section("Annotation Guidelines")
     info("If you have a guidelines document (markdown), place it at guidelines.md")
     info("in the project root. It will be shown to annotators in Label Studio.")
-    if os.path.exists('guidelines.md'):
+    if Path('guidelines.md').is_file():
         success("Found guidelines.md — will be included in project setup")
     else:
         info("No guidelines.md found — you can add one later.")
@@ -323,11 +453,11 @@ def run_wizard():
     info("Requires OpenClaw (https://github.com/openclaw/openclaw).")
     print()
 
-    use_agent = confirm("Set up an AI assistant?", default=False)
+    use_agent = confirm("Set up an AI assistant?", default=False, key='agent')
     config['agent'] = {'enabled': use_agent}
     if use_agent:
-        guild_id = ask("Discord server (guild) ID")
-        channel = ask("Discord channel name", "general")
+        guild_id = ask("Discord server (guild) ID", key='guild_id')
+        channel = ask("Discord channel name", "general", key='channel')
         config['agent']['discord'] = {
             'guild_id': guild_id or 'YOUR_GUILD_ID',
             'channel': channel,
@@ -337,40 +467,48 @@ def run_wizard():
 
     section("Generating Files")
 
+    # Render everything first, then write it all in one pass
+    outputs = []
+    generated = []
+
     # 1. config.yaml
-    write_config_yaml(config)
-    success("config.yaml")
+    outputs.append(render_config_yaml(config))
+    generated.append("config.yaml")
 
     # 2. Label Studio XML
-    xml = build_schema(config['schema'])
-    Path('label-config.xml').write_text(xml)
-    success("label-config.xml (Label Studio schema)")
+    build_schema = _load_schema_builder().build_schema
+    outputs.append((Path('label-config.xml'), build_schema(config['schema'])))
+    generated.append("label-config.xml (Label Studio schema)")
 
     # 3. docker-compose.yaml (if Docker deployment)
     if config.get('_deploy') in (1, 2):
-        write_docker_compose(config)
-        success("docker-compose.yaml")
+        outputs.append(render_docker_compose(config))
+        generated.append("docker-compose.yaml")
 
-        write_caddyfile(config)
-        success("Caddyfile (reverse proxy + TLS)")
+        outputs.append(render_caddyfile(config))
+        generated.append("Caddyfile (reverse proxy + TLS)")
 
     # 4. .env file
-    write_env(config)
-    success(".env (credentials — gitignored)")
+    outputs.append(render_env(config))
+    generated.append(".env (credentials — gitignored)")
 
     # 5. Agent workspace (if enabled)
     if config['agent']['enabled']:
-        write_agent_files(config)
-        success("agent/ workspace (SOUL.md, AGENTS.md, TOOLS.md)")
+        outputs.extend(render_agent_files(config))
+        generated.append("agent/ workspace (SOUL.md, AGENTS.md, TOOLS.md)")
+
+    write_outputs(outputs)
+    for name in generated:
+        success(name)
 
     # 6. Export script
     if config['export']['git']['enabled']:
-        os.makedirs('exports', exist_ok=True)
+        Path('exports').mkdir(exist_ok=True)
         success("exports/ directory")
 
     # 7. Data directory
     if config.get('data', {}).get('source'):
-        os.makedirs(config['data']['source'], exist_ok=True)
+        Path(config['data']['source']).mkdir(parents=True, exist_ok=True)
         success(f"{config['data']['source']} directory")
 
     # ─── Summary ─────────────────────────────────────────────────────────────
@@ -413,102 +551,12 @@ def run_wizard():
     print()
 
 
-# ─── File writers ────────────────────────────────────────────────────────────
-
-def write_config_yaml(config):
-    """Write config.yaml (manually to preserve comments and ordering)."""
-    lines = []
-    lines.append("# annotate-box configuration")
-    lines.append(f"# Generated by setup wizard\n")
-
-    # Project
-    lines.append("project:")
-    lines.append(f'  name: "{config["project"]["name"]}"')
-    if config['project'].get('description'):
-        lines.append(f'  description: "{config["project"]["description"]}"')
+# ─── File templates ──────────────────────────────────────────────────────────
+#
+# string.Template placeholders ($port, $url); $$ is a literal $ (compose
+# variables are expanded by docker compose, not here).
 
-    # Server
-    lines.append("\nserver:")
-    if 'duckdns' in config.get('server', {}):
-        lines.append("  duckdns:")
-        lines.append(f'    subdomain: {config["server"]["duckdns"]["subdomain"]}')
-        lines.append(f'    token: {config["server"]["duckdns"]["token"]}')
-    elif 'domain' in config.get('server', {}):
-        lines.append(f'  domain: {config["server"]["domain"]}')
-    lines.append(f'  port: {config["server"].get("port", 8093)}')
-    lines.append("  admin:")
-    lines.append(f'    email: {config["server"]["admin"]["email"]}')
-    lines.append(f'    password: {config["server"]["admin"]["password"]}')
-
-    # Team
-    lines.append("\nteam:")
-    for member in config.get('team', []):
-        role_str = f"\n    role: {member['role']}" if member.get('role') else ""
-        lines.append(f'  - name: {member["name"]}')
-        lines.append(f'    email: {member.get("email", "")}')
-        if member.get('role'):
-            lines.append(f'    role: {member["role"]}')
-
-    # Schema
-    lines.append("\nschema:")
-    lines.append(f'  type: {config["schema"]["type"]}')
-    if config["schema"].get("granularity"):
-        lines.append(f'  granularity: {config["schema"]["granularity"]}')
-    if config["schema"].get("multi_label"):
-        lines.append(f'  multi_label: true')
-    lines.append(f'  max_annotations: {config["schema"].get("max_annotations", 1)}')
-    lines.append("  labels:")
-    for label in config["schema"]["labels"]:
-        lines.append(f'    - name: {label["name"]}')
-        if label.get('hotkey'):
-            lines.append(f'      hotkey: "{label["hotkey"]}"')
-        lines.append(f'      color: "{label["color"]}"')
-        if label.get('description'):
-            lines.append(f'      description: "{label["description"]}"')
-
-    # Data
-    if config.get('data', {}).get('format'):
-        lines.append("\ndata:")
-        lines.append(f'  format: {config["data"]["format"]}')
-        lines.append(f'  source: {config["data"].get("source", "./data/")}')
-        if config["data"].get("sentence_split"):
-            lines.append("  sentence_split: true")
-        if config["data"].get("shuffle"):
-            lines.append("  shuffle: true")
-            lines.append(f'  shuffle_seed: {config["data"].get("shuffle_seed", 42)}')
-        if config["data"].get("max_items"):
-            lines.append(f'  max_items: {config["data"]["max_items"]}')
-
-    # Export
-    lines.append("\nexport:")
-    lines.append(f'  schedule: {config["export"]["schedule"]}')
-    lines.append(f'  format: {config["export"].get("format", "json")}')
-    if config["export"].get("time"):
-        lines.append(f'  time: "{config["export"]["time"]}"')
-    if config["export"].get("timezone"):
-        lines.append(f'  timezone: "{config["export"]["timezone"]}"')
-    lines.append("  git:")
-    lines.append(f'    enabled: {str(config["export"]["git"]["enabled"]).lower()}')
-    if config["export"]["git"].get("push"):
-        lines.append(f'    push: {str(config["export"]["git"]["push"]).lower()}')
-
-    # Agent
-    lines.append("\nagent:")
-    lines.append(f'  enabled: {str(config["agent"]["enabled"]).lower()}')
-    if config["agent"].get("discord"):
-        lines.append("  discord:")
-        lines.append(f'    guild_id: "{config["agent"]["discord"]["guild_id"]}"')
-        lines.append(f'    channel: {config["agent"]["discord"]["channel"]}')
-
-    Path('config.yaml').write_text('\n'.join(lines) + '\n')
-
-
-def write_docker_compose(config):
-    """Generate docker-compose.yaml with Label Studio + Caddy."""
-    domain = config.get('_domain', 'localhost')
-    port = config['server'].get('port', 8093)
-
-    compose = f"""# annotate-box docker compose
+_COMPOSE_TEMPLATE = Template("""# annotate-box docker compose
 # Usage: docker compose up -d
 
 services:
@@ -519,7 +567,7 @@ services:
     environment:
       - POSTGRES_DB=labelstudio
       - POSTGRES_USER=labelstudio
-      - POSTGRES_PASSWORD=${{POSTGRES_PASSWORD:-labelstudio}}
+      - POSTGRES_PASSWORD=$${POSTGRES_PASSWORD:-labelstudio}
     volumes:
       - pg-data:/var/lib/postgresql/data
     healthcheck:
@@ -533,19 +581,19 @@ services:
     container_name: annotate-box-ls
     restart: unless-stopped
     ports:
-      - "127.0.0.1:{port}:{port}"
+      - "127.0.0.1:$port:$port"
     environment:
-      - LABEL_STUDIO_HOST=${{LABEL_STUDIO_HOST}}
-      - LABEL_STUDIO_PORT={port}
+      - LABEL_STUDIO_HOST=$${LABEL_STUDIO_HOST}
+      - LABEL_STUDIO_PORT=$port
       - DJANGO_DB=default
       - POSTGRE_NAME=labelstudio
       - POSTGRE_USER=labelstudio
-      - POSTGRE_PASSWORD=${{POSTGRES_PASSWORD:-labelstudio}}
+      - POSTGRE_PASSWORD=$${POSTGRES_PASSWORD:-labelstudio}
       - POSTGRE_HOST=postgres
       - POSTGRE_PORT=5432
       - LABEL_STUDIO_LOCAL_FILES_SERVING_ENABLED=true
       - LABEL_STUDIO_LOCAL_FILES_DOCUMENT_ROOT=/label-studio/files
-      - CSRF_TRUSTED_ORIGINS=${{CSRF_TRUSTED_ORIGINS}}
+      - CSRF_TRUSTED_ORIGINS=$${CSRF_TRUSTED_ORIGINS}
     env_file:
       - .env
     volumes:
@@ -555,7 +603,7 @@ services:
       postgres:
         condition: service_healthy
     healthcheck:
-      test: ["CMD", "curl", "-f", "http://localhost:{port}/health"]
+      test: ["CMD", "curl", "-f", "http://localhost:$port/health"]
       interval: 30s
       timeout: 10s
       retries: 3
@@ -581,29 +629,102 @@ volumes:
   ls-files:
   caddy-data:
   caddy-config:
+""")
+
+_AGENTS_MD = """# AGENTS.md
+
+## Every Session
+1. Read `SOUL.md` — your identity and project context
+2. Help the team with annotation questions and Label Studio issues
+
+## What You Do
+- Answer schema questions
+- Troubleshoot Label Studio
+- Run exports when asked
+- Monitor annotation progress
+"""
+
+_TOOLS_TEMPLATE = Template("""# Tools
+
+## Label Studio
+- **URL:** $url
+- **Admin:** See .env for credentials
+- **API auth:** Session cookies (GET /user/login → CSRF → POST login)
+
+## Export
+Run `bash scripts/export.sh` to export and commit annotations.
+
+## Server
+```bash
+docker compose ps        # check status
+docker compose logs -f   # watch logs
+docker compose restart   # restart everything
+```
+""")
+
+_AGENT_README_MD = """# Agent Setup
+
+To use the AI assistant, you need [OpenClaw](https://github.com/openclaw/openclaw).
+
+1. Copy the `agent/` directory to your OpenClaw workspace
+2. Configure the gateway to bind to your Discord server
+3. The agent will respond in your project's Discord channel
+
+See OpenClaw docs for gateway configuration details.
 """
-    Path('docker-compose.yaml').write_text(compose)
 
 
-def write_caddyfile(config):
+# ─── File writers ────────────────────────────────────────────────────────────
+#
+# The render_* functions are pure: each returns (path, text) pairs and
+# write_outputs() puts them on disk.
+
+def write_outputs(outputs):
+    """Write (path, text) pairs as UTF-8, creating parent directories as needed."""
+    for path, text in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = memoryview(text.encode('utf-8'))
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+
+
+def render_config_yaml(config):
+    """Render config.yaml, one YAML block per section in wizard order.
+
+    Keys starting with '_' are wizard-internal and are not written.
+    """
+    blocks = ["# annotate-box configuration\n# Generated by setup wizard\n"]
+    for key, value in config.items():
+        if key.startswith('_') or value == {}:
+            continue
+        blocks.append(yaml.dump({key: value}, Dumper=_YAML_DUMPER, sort_keys=False,
+                                default_flow_style=False, allow_unicode=True))
+    return Path('config.yaml'), '\n'.join(blocks)
+
+
+def render_docker_compose(config):
+    """Generate docker-compose.yaml with Label Studio + Caddy."""
+    port = config['server'].get('port', 8093)
+    return Path('docker-compose.yaml'), _COMPOSE_TEMPLATE.substitute(port=port)
+
+
+def render_caddyfile(config):
     """Generate Caddyfile for reverse proxy + automatic TLS."""
     domain = config.get('_domain', 'localhost')
     port = config['server'].get('port', 8093)
 
-    if domain == 'localhost':
-        caddyfile = f"""http://localhost {{
+    site = 'http://localhost' if domain == 'localhost' else domain
+    return Path('Caddyfile'), f"""{site} {{
     reverse_proxy label-studio:{port}
 }}
 """
-    else:
-        caddyfile = f"""{domain} {{
-    reverse_proxy label-studio:{port}
-}}
-"""
-    Path('Caddyfile').write_text(caddyfile)
 
 
-def write_env(config):
+def render_env(config):
     """Generate .env file with credentials."""
     domain = config.get('_domain', 'localhost')
     port = config['server'].get('port', 8093)
@@ -616,104 +737,96 @@ def write_env(config):
         origins = host
 
     pg_pass = random_password(20)
-    env_lines = [
-        f"# annotate-box environment",
-        f"LABEL_STUDIO_HOST={host}",
-        f"LABEL_STUDIO_PORT={port}",
-        f"CSRF_TRUSTED_ORIGINS={origins}",
-        f"",
-        f"# Database",
-        f"POSTGRES_PASSWORD={pg_pass}",
-        f"",
-        f"# Admin credentials",
-        f"LABEL_STUDIO_USERNAME={config['server']['admin']['email']}",
-        f"LABEL_STUDIO_PASSWORD={config['server']['admin']['password']}",
-    ]
+    env = f"""# annotate-box environment
+LABEL_STUDIO_HOST={host}
+LABEL_STUDIO_PORT={port}
+CSRF_TRUSTED_ORIGINS={origins}
+
+# Database
+POSTGRES_PASSWORD={pg_pass}
+
+# Admin credentials
+LABEL_STUDIO_USERNAME={config['server']['admin']['email']}
+LABEL_STUDIO_PASSWORD={config['server']['admin']['password']}
+"""
 
     if 'duckdns' in config.get('server', {}):
-        env_lines.append(f"")
-        env_lines.append(f"# DuckDNS")
-        env_lines.append(f"DUCKDNS_TOKEN={config['server']['duckdns']['token']}")
+        env += f"\n# DuckDNS\nDUCKDNS_TOKEN={config['server']['duckdns']['token']}\n"
 
-    Path('.env').write_text('\n'.join(env_lines) + '\n')
+    return Path('.env'), env
 
 
-def write_agent_files(config):
-    """Generate OpenClaw agent workspace files."""
-    os.makedirs('agent', exist_ok=True)
+def _fmt_member(member):
+    """One SOUL.md team line: - **Name** (email) — role"""
+    parts = [f"- **{member['name']}**"]
+    if member.get('email'):
+        parts.append(f" ({member['email']})")
+    if member.get('role'):
+        parts.append(f" — {member['role']}")
+    return ''.join(parts)
+
 
+def render_agent_files(config):
+    """Generate OpenClaw agent workspace files."""
     project_name = config['project']['name']
     domain = config.get('_domain', 'localhost')
-    team_list = '\n'.join(
-        f"- **{m['name']}**{' (' + m['email'] + ')' if m.get('email') else ''}"
-        + (f" — {m['role']}" if m.get('role') else '')
-        for m in config.get('team', [])
-    )
+    team_list = '\n'.join(map(_fmt_member, config.get('team', [])))
 
-    schema_rows = "| Label | Hotkey | Description |\n|-------|--------|-------------|\n"
-    for label in config['schema']['labels']:
-        schema_rows += f"| {label['name']} | {label.get('hotkey', '')} | {label.get('description', '')} |\n"
+    schema_rows = "| Label | Hotkey | Description |\n|-------|--------|-------------|\n" + ''.join(
+        f"| {label['name']} | {label.get('hotkey', '')} | {label.get('description', '')} |\n"
+        for label in config['schema']['labels']
+    )
 
     url = f"https://{domain}" if domain != 'localhost' else f"http://localhost:{config['server'].get('port', 8093)}"
 
     # SOUL.md
-    soul_template = Path('templates/agent/SOUL.md').read_text()
-    soul = soul_template.replace('{{PROJECT_NAME}}', project_name)
-    soul = soul.replace('{{TEAM_LIST}}', team_list)
-    soul = soul.replace('{{SCHEMA_TABLE}}', schema_rows)
-    soul = soul.replace('{{LABEL_STUDIO_URL}}', url)
-    Path('agent/SOUL.md').write_text(soul)
-
-    # AGENTS.md
-    Path('agent/AGENTS.md').write_text(f"""# AGENTS.md
-
-## Every Session
-1. Read `SOUL.md` — your identity and project context
-2. Help the team with annotation questions and Label Studio issues
-
-## What You Do
-- Answer schema questions
-- Troubleshoot Label Studio
-- Run exports when asked
-- Monitor annotation progress
-""")
-
-    # TOOLS.md
-    Path('agent/TOOLS.md').write_text(f"""# Tools
-
-## Label Studio
-- **URL:** {url}
-- **Admin:** See .env for credentials
-- **API auth:** Session cookies (GET /user/login → CSRF → POST login)
-
-## Export
-Run `bash scripts/export.sh` to export and commit annotations.
-
-## Server
-```bash
-docker compose ps        # check status
-docker compose logs -f   # watch logs
-docker compose restart   # restart everything
-```
-""")
-
-    Path('agent/README.md').write_text(f"""# Agent Setup
+    soul = _SOUL_TEMPLATE.format_map({
+        'project_name': project_name,
+        'team_list': team_list,
+        'schema_table': schema_rows,
+        'label_studio_url': url,
+    })
+
+    agent = Path('agent')
+    return [
+        (agent / 'SOUL.md', soul),
+        (agent / 'AGENTS.md', _AGENTS_MD),
+        (agent / 'TOOLS.md', _TOOLS_TEMPLATE.substitute(url=url)),
+        (agent / 'README.md', _AGENT_README_MD),
+    ]
 
-To use the AI assistant, you need [OpenClaw](https://github.com/openclaw/openclaw).
 
-1. Copy the `agent/` directory to your OpenClaw workspace
-2. Configure the gateway to bind to your Discord server
-3. The agent will respond in your project's Discord channel
+# ─── Entry point ─────────────────────────────────────────────────────────────
 
-See OpenClaw docs for gateway configuration details.
-""")
+def main():
+    global _ANSWERS, _NON_INTERACTIVE
+    parser = argparse.ArgumentParser(description='annotate-box setup wizard')
+    parser.add_argument('--answers', help='YAML file of pre-filled answers, keyed by question')
+    parser.add_argument('--non-interactive', action='store_true',
+                        help='never prompt; questions without an answer take their default')
+    args = parser.parse_args()
+
+    if args.answers:
+        with open(args.answers, 'rb') as f:
+            answers = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+        if not isinstance(answers, dict):
+            sys.exit(f"{args.answers}: answers file must be a YAML mapping")
+        _ANSWERS = answers
+    _NON_INTERACTIVE = args.non_interactive
+
+    # Emit wizard output line by line even when stdout is a pipe, so logs
+    # stay in step with the prompts that _read_line flushes explicitly
+    try:
+        sys.stdout.reconfigure(line_buffering=True)
+    except AttributeError:
+        pass
 
+    run_wizard()
 
-# ─── Entry point ─────────────────────────────────────────────────────────────
 
 if __name__ == '__main__':
     try:
-        run_wizard()
+        main()
     except KeyboardInterrupt:
         print(f"\n\n  {DIM}Setup cancelled.{RESET}\n")
         sys.exit(1)
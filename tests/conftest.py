@@ -1,2 +1,13 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+# Parallel runs: pytest -n auto --dist loadgroup (needs pytest-xdist from
+# requirements-dev.txt).
+# Tests that write temp files are pinned to the "io" group so they share one
+# worker; the pure-CPU iaa and schema_builder tests are left ungrouped and
+# spread freely across workers.
+
+
+def pytest_configure(config):
+    # Registered here so the mark is known even without pytest-xdist installed
+    config.addinivalue_line("markers", "xdist_group(name): run tests in this group on the same xdist worker")
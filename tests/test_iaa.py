@@ -1,12 +1,30 @@
 """Tests for iaa.py — inter-annotator agreement metrics."""
+import json
 import pytest
 from iaa import (
-    cohens_kappa, percent_agreement, span_exact_match,
+    cohens_kappa, percent_agreement, pairwise_agreement, span_exact_match,
+    build_reliability, krippendorff_alpha, krippendorff_alpha_from, _alpha_nominal,
+    intern_classification, reliability_from_codes,
     extract_classification_annotations, extract_span_annotations,
-    detect_task_type, generate_report,
+    detect_task_type, generate_report, walk_results,
+    _get_agreement_counts, _agreement_counts_np, _JIT_MIN_CELLS,
+    load_export, StreamedExport, per_label_alpha,
 )
 
 
+# ─── Fixtures ────────────────────────────────────────────────────────────────
+
+# Shared, read-only result lists for classification tasks
+_CHOICE_RESULTS = {c: ({'type': 'choices', 'value': {'choices': [c]}},) for c in ('POS', 'NEG', 'X')}
+
+
+def _mk_clf_task(tid, choices_by_user):
+    """Classification task with one choices result per (annotator, label) pair."""
+    return {'id': tid, 'annotations': [
+        {'completed_by': u, 'result': _CHOICE_RESULTS[c]} for u, c in choices_by_user
+    ]}
+
+
 # ─── Cohen's Kappa ───────────────────────────────────────────────────────────
 
 class TestCohensKappa:
@@ -41,6 +59,37 @@ class TestCohensKappa:
         assert cohens_kappa({1: 'A'}, {2: 'B'}) is None
 
 
+# ─── Pairwise Agreement ──────────────────────────────────────────────────────
+
+class TestPairwiseAgreement:
+    def test_matches_scalar_metrics(self):
+        tasks = {1: {'a': 'X', 'b': 'X'}, 2: {'a': 'Y', 'b': 'X'},
+                 3: {'a': 'Y', 'b': 'Y'}, 4: {'a': 'X'}}
+        labels_a = {k: v['a'] for k, v in tasks.items() if 'a' in v}
+        labels_b = {k: v['b'] for k, v in tasks.items() if 'b' in v}
+        [(a1, a2, shared, p, k)] = list(pairwise_agreement(tasks, ['a', 'b']))
+        assert (a1, a2, shared) == ('a', 'b', 3)
+        assert p == pytest.approx(percent_agreement(labels_a, labels_b))
+        assert k == pytest.approx(cohens_kappa(labels_a, labels_b))
+
+    def test_no_shared_items(self):
+        tasks = {1: {'a': 'X'}, 2: {'b': 'Y'}}
+        [(_, _, shared, p, k)] = list(pairwise_agreement(tasks, ['a', 'b']))
+        assert shared == 0
+        assert p is None and k is None
+
+    def test_small_workloads_use_numpy_kernel(self):
+        assert _get_agreement_counts(_JIT_MIN_CELLS - 1) is _agreement_counts_np
+
+    def test_jit_kernel_matches_numpy(self):
+        np = pytest.importorskip('numpy')
+        pytest.importorskip('numba')
+        codes_a = np.array([0, 1, 1, -1, 2, 0], np.int64)
+        codes_b = np.array([0, 1, 0, 2, -1, 0], np.int64)
+        jit = _get_agreement_counts(_JIT_MIN_CELLS)
+        assert jit(codes_a, codes_b, 3) == pytest.approx(_agreement_counts_np(codes_a, codes_b, 3))
+
+
 # ─── Percent Agreement ──────────────────────────────────────────────────────
 
 class TestPercentAgreement:
@@ -58,6 +107,80 @@ class TestPercentAgreement:
         assert percent_agreement({}, {}) is None
 
 
+# ─── Reliability data ────────────────────────────────────────────────────────
+
+class TestReliabilityData:
+    TASKS = {1: {'a': 'X', 'b': 'X'}, 2: {'a': 'Y', 'b': 'X'}, 3: {'a': 'Y', 'b': 'Y'}}
+
+    def test_matrix_shape_and_missing(self):
+        pytest.importorskip('numpy')
+        rd = build_reliability({1: {'a': 'X'}, 2: {'b': 'Y'}}, {'a', 'b'})
+        assert rd.annotators == ['a', 'b']
+        assert rd.items == [1, 2]
+        assert rd.label_map == {'X': 0, 'Y': 1}
+        assert rd.matrix[0, 0] == 0
+        assert rd.matrix[1, 1] == 1
+        assert rd.matrix[0, 1] != rd.matrix[0, 1]  # NaN for missing
+
+    def test_alpha_from_matches_alpha(self):
+        pytest.importorskip('numpy')
+        rd = build_reliability(self.TASKS, {'a', 'b'})
+        assert krippendorff_alpha_from(rd) == pytest.approx(krippendorff_alpha(self.TASKS, {'a', 'b'}))
+
+    def test_codes_match_dict_path(self):
+        np = pytest.importorskip('numpy')
+
+        def choice(label):
+            return [{'type': 'choices', 'value': {'choices': [label]}}]
+
+        data = [
+            {'id': 2, 'annotations': [
+                {'completed_by': 'b', 'result': choice('Y')},
+                {'completed_by': 'a', 'result': choice('X')},
+                {'completed_by': 'a', 'result': choice('Z')},  # later choice wins
+            ]},
+            {'id': 1, 'annotations': [
+                {'completed_by': 'c', 'result': []},
+                {'completed_by': 'a', 'result': choice('Y')},
+            ]},
+        ]
+        rd = reliability_from_codes(*intern_classification(walk_results(data)))
+        tasks, annotators = extract_classification_annotations(data)
+        expected = build_reliability(tasks, annotators)
+        assert rd.annotators == expected.annotators == ['a', 'b', 'c']
+        assert rd.items == expected.items
+        assert rd.label_map == expected.label_map
+        np.testing.assert_array_equal(rd.matrix, expected.matrix)
+
+    def test_per_label_alpha(self):
+        pytest.importorskip('numpy')
+        # Z is only ever used by annotator a
+        tasks = {1: {'a': 'X', 'b': 'X'}, 2: {'a': 'X', 'b': 'Y'},
+                 3: {'a': 'Y', 'b': 'Y'}, 4: {'a': 'Z', 'b': 'Y'}}
+        result = {label: (count, alpha) for label, count, alpha
+                  in per_label_alpha(build_reliability(tasks, {'a', 'b'}))}
+        # By hand, with n = 8 pairable values: alpha = 1 - 7 * (8 - agree) / (64 - Σ n_c²)
+        assert result['X'] == (3, pytest.approx(1 - 7 * 2 / 30))   # agree 6, n_c = 3, 5
+        assert result['Y'] == (4, pytest.approx(1 - 7 * 4 / 32))   # agree 4, n_c = 4, 4
+        assert result['Z'] == (1, pytest.approx(0.0))              # agree 6, n_c = 1, 7
+
+    def test_nominal_alpha_matches_krippendorff_package(self):
+        np = pytest.importorskip('numpy')
+        krippendorff = pytest.importorskip('krippendorff')
+        matrix = np.array([
+            [1, 2, 3, 3, 2, 1, 4, 1, 2, np.nan, np.nan, np.nan],
+            [1, 2, 3, 3, 2, 2, 4, 1, 2, 5, np.nan, 3],
+            [np.nan, 3, 3, 3, 2, 3, 4, 2, 2, 5, 1, np.nan],
+            [1, 2, 3, 3, 2, 4, 4, 1, 2, 5, 1, np.nan],
+        ])
+        expected = krippendorff.alpha(reliability_data=matrix, level_of_measurement='nominal')
+        assert _alpha_nominal(matrix) == pytest.approx(expected)
+
+    def test_nominal_alpha_single_value_is_none(self):
+        np = pytest.importorskip('numpy')
+        assert _alpha_nominal(np.array([[1.0, 1.0], [1.0, np.nan]])) is None
+
+
 # ─── Span Exact Match ───────────────────────────────────────────────────────
 
 class TestSpanExactMatch:
@@ -91,16 +214,7 @@ class TestSpanExactMatch:
 
 class TestExtraction:
     def test_classification_extraction(self):
-        data = [{
-            'id': 1,
-            'annotations': [{
-                'completed_by': 'alice',
-                'result': [{'type': 'choices', 'value': {'choices': ['POS']}}]
-            }, {
-                'completed_by': 'bob',
-                'result': [{'type': 'choices', 'value': {'choices': ['NEG']}}]
-            }]
-        }]
+        data = [_mk_clf_task(1, [('alice', 'POS'), ('bob', 'NEG')])]
         tasks, annotators = extract_classification_annotations(data)
         assert tasks[1]['alice'] == 'POS'
         assert tasks[1]['bob'] == 'NEG'
@@ -117,6 +231,19 @@ class TestExtraction:
         tasks, annotators = extract_span_annotations(data)
         assert (0, 5, 'PER') in tasks[1]['alice']
 
+    def test_walk_results_keeps_empty_annotations(self):
+        data = [{
+            'id': 1,
+            'annotations': [
+                {'completed_by': 'alice', 'result': _CHOICE_RESULTS['POS']},
+                {'completed_by': 'bob', 'result': []},
+            ]
+        }]
+        assert list(walk_results(data)) == [
+            (1, 'alice', 'choices', {'choices': ['POS']}),
+            (1, 'bob', None, None),
+        ]
+
 
 # ─── Detection ───────────────────────────────────────────────────────────────
 
@@ -140,23 +267,66 @@ class TestDetection:
 
 # ─── Report generation ──────────────────────────────────────────────────────
 
+@pytest.fixture(scope="module")
+def clf_data():
+    """Five tasks where annotators a and b both choose X (read-only)."""
+    return [_mk_clf_task(i, [('a', 'X'), ('b', 'X')]) for i in range(5)]
+
+
 class TestReport:
     def test_empty_data(self):
         report = generate_report([], task_type='classification')
         assert 'Tasks: 0' in report
 
-    def test_classification_report(self):
-        data = [{
-            'id': i,
-            'annotations': [
-                {'completed_by': 'a', 'result': [{'type': 'choices', 'value': {'choices': ['X']}}]},
-                {'completed_by': 'b', 'result': [{'type': 'choices', 'value': {'choices': ['X']}}]},
-            ]
-        } for i in range(5)]
-        report = generate_report(data, task_type='classification')
+    def test_classification_report(self, clf_data):
+        report = generate_report(clf_data, task_type='classification')
         assert 'kappa' in report.lower() or 'agreement' in report.lower()
 
+    def test_paragraph_items_bounded_by_paragraph_count(self):
+        def para(user, start, end):
+            value = {'start': start, 'end': end, 'paragraphlabels': ['X']}
+            return {'completed_by': user, 'result': [{'type': 'paragraphlabels', 'value': value}]}
+        data = [
+            # Indices 2-4 fall past the task's two paragraphs
+            {'id': 1, 'data': {'text': [{'text': 's1'}, {'text': 's2'}]},
+             'annotations': [para('a', 0, 5), para('b', 0, 5)]},
+            # Plain-text task: no paragraph items at all
+            {'id': 2, 'data': {'text': 'not paragraphs'},
+             'annotations': [para('a', 0, 1), para('b', 0, 1)]},
+        ]
+        report = generate_report(data, task_type='paragraph')
+        assert 'Sentences with 2+ annotations: 2' in report
+
     def test_markdown_format(self):
-        data = [{'id': 1, 'annotations': []}]
+        data = [_mk_clf_task(1, [])]
         report = generate_report(data, task_type='classification', fmt='markdown')
         assert '##' in report
+
+
+# ─── Export loading ──────────────────────────────────────────────────────────
+
+class TestLoadExport:
+    def _write(self, tmp_path, data):
+        path = tmp_path / 'export.json'
+        path.write_text(json.dumps(data), encoding='utf-8')
+        return path
+
+    def test_streamed_report_matches_in_memory(self, tmp_path):
+        pytest.importorskip('ijson')
+        data = [_mk_clf_task(i, [('a', 'POS'), ('b', 'POS' if i % 3 else 'NEG')]) for i in range(6)]
+        exported = load_export(self._write(tmp_path, data))
+        assert isinstance(exported, StreamedExport)
+        assert generate_report(exported) == generate_report(data)
+
+    def test_numbers_ijson_rejects_fall_back_to_json(self, tmp_path):
+        pytest.importorskip('ijson')
+        data = [_mk_clf_task(1, [('a', 'POS')]), _mk_clf_task(12345678901234567890, [('a', 'NEG')])]
+        data[0]['score'] = float('inf')  # written as Infinity
+        path = self._write(tmp_path, data)
+        assert list(StreamedExport(path)) == json.loads(path.read_text(encoding='utf-8'))
+
+    def test_in_memory_keeps_long_integers_exact(self, tmp_path, monkeypatch):
+        import iaa
+        monkeypatch.setattr(iaa, 'HAS_IJSON', False)
+        path = self._write(tmp_path, [_mk_clf_task(123456789012345678901234, [('a', 'POS')])])
+        assert load_export(path)[0]['id'] == 123456789012345678901234
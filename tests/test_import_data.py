@@ -7,13 +7,21 @@ from pathlib import Path
 
 from import_data import (
     load_text_files, load_csv, load_json, load_jsonl,
-    format_for_label_studio, LOADERS,
+    find_files, LOADERS, sentence_split, HAS_NLTK, _get_punkt,
+    _dumps, _dumps_line, main,
 )
 
+pytestmark = pytest.mark.xdist_group("io")
 
-@pytest.fixture
-def tmp_data(tmp_path):
-    """Create a temp directory with sample data files."""
+
+@pytest.fixture(scope="session")
+def tmp_data(tmp_path_factory):
+    """Create a temp directory with sample data files.
+
+    Session-scoped: the loaders only read these files. Tests that need to
+    write their own files use a fresh tmp_path instead.
+    """
+    tmp_path = tmp_path_factory.mktemp("import_data")
     # Text files
     (tmp_path / "doc1.txt").write_text("Hello world.", encoding='utf-8')
     (tmp_path / "doc2.txt").write_text("Second document.\nWith two lines.", encoding='utf-8')
@@ -41,55 +49,96 @@ def tmp_data(tmp_path):
     return tmp_path
 
 
+@pytest.fixture(scope="session")
+def tmp_data_str(tmp_data):
+    """tmp_data as a str path, converted once for the loaders."""
+    return str(tmp_data)
+
+
+# ─── File discovery ──────────────────────────────────────────────────────────
+
+class TestFindFiles:
+    def test_recurses_and_matches_suffixes(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "b.tsv").write_text("", encoding='utf-8')
+        (tmp_path / "sub" / "a.csv").write_text("", encoding='utf-8')
+        (tmp_path / "c.jsonl").write_text("", encoding='utf-8')
+        files = find_files(tmp_path, ('.csv', '.tsv'))
+        assert [f.relative_to(tmp_path).as_posix() for f in files] == ['b.tsv', 'sub/a.csv']
+
+    def test_missing_directory(self, tmp_path):
+        assert find_files(tmp_path / "nope", '.txt') == []
+
+
 # ─── Loaders ─────────────────────────────────────────────────────────────────
 
 class TestLoadTextFiles:
-    def test_loads_txt_files(self, tmp_data):
-        items = load_text_files(str(tmp_data))
+    def test_loads_txt_files(self, tmp_data_str):
+        items = load_text_files(tmp_data_str)
         # empty.txt should be skipped
         assert len(items) == 2
-        assert all('text' in i for i in items)
+        assert all('text' in i['data'] for i in items)
 
     def test_empty_directory(self, tmp_path):
         items = load_text_files(str(tmp_path))
         assert items == []
 
-    def test_metadata_has_filename(self, tmp_data):
-        items = load_text_files(str(tmp_data))
-        assert all('filename' in i['meta'] for i in items)
+    def test_metadata_has_filename(self, tmp_data_str):
+        items = load_text_files(tmp_data_str)
+        assert all('filename' in i['data']['meta'] for i in items)
+
+    def test_thread_pool_keeps_file_order(self, tmp_path, monkeypatch):
+        import import_data
+        for i in range(import_data._PARALLEL_MIN_FILES + 4):
+            (tmp_path / f"{i:02d}.txt").write_text(f"doc {i}", encoding='utf-8')
+        serial = load_text_files(str(tmp_path))
+        monkeypatch.setattr(import_data, '_usable_cpus', lambda: 4)
+        assert load_text_files(str(tmp_path)) == serial
 
     def test_unicode_content(self, tmp_path):
         (tmp_path / "uni.txt").write_text("日本語テスト", encoding='utf-8')
         items = load_text_files(str(tmp_path))
-        assert items[0]['text'] == "日本語テスト"
+        assert items[0]['data']['text'] == "日本語テスト"
 
 
 class TestLoadCsv:
-    def test_loads_csv(self, tmp_data):
-        items = load_csv(str(tmp_data))
-        texts = [i['text'] for i in items]
+    def test_loads_csv(self, tmp_data_str):
+        items = load_csv(tmp_data_str)
+        texts = [i['data']['text'] for i in items]
         assert 'foo' in texts
         assert 'bar' in texts
 
-    def test_loads_tsv(self, tmp_data):
-        items = load_csv(str(tmp_data))
-        texts = [i['text'] for i in items]
+    def test_loads_tsv(self, tmp_data_str):
+        items = load_csv(tmp_data_str)
+        texts = [i['data']['text'] for i in items]
         assert 'baz' in texts
 
     def test_custom_text_column(self, tmp_path):
         (tmp_path / "c.csv").write_text("content,id\nhello,1\n", encoding='utf-8')
         items = load_csv(str(tmp_path), text_column='content')
-        assert items[0]['text'] == 'hello'
+        assert items[0]['data']['text'] == 'hello'
 
     def test_empty_csv(self, tmp_path):
         (tmp_path / "e.csv").write_text("text\n", encoding='utf-8')
         items = load_csv(str(tmp_path))
         assert items == []
 
+    @pytest.mark.parametrize("content", [
+        "text,id\nfoo,1\n\"bar, baz\",2\n",  # regular
+        "text,id\nfoo,1,extra\nbar,2\n",      # extra field on the first row
+        "text,id\nfoo,1\nbar,2,extra\n",      # extra field on a later row
+        "text,id,note\nfoo,1\nbar,2,n\n",     # short row
+        "text,id,id\nfoo,1,2\n",              # duplicate header
+    ], ids=['regular', 'extra_first_row', 'extra_later_row', 'short_row', 'duplicate_header'])
+    def test_irregular_rows_load(self, tmp_path, content):
+        (tmp_path / "r.csv").write_text(content, encoding='utf-8')
+        items = load_csv(str(tmp_path))
+        assert [i['data']['text'] for i in items][:1] == ['foo']
+
 
 class TestLoadJson:
-    def test_loads_json_array(self, tmp_data):
-        items = load_json(str(tmp_data))
+    def test_loads_json_array(self, tmp_data_str):
+        items = load_json(tmp_data_str)
         # empty text item should be skipped
         assert len(items) == 2
 
@@ -98,46 +147,82 @@ class TestLoadJson:
         items = load_json(str(tmp_path))
         assert len(items) == 1
 
+    def test_numbers_beyond_ijson(self, tmp_path):
+        """A streamed array falls back to json for numbers ijson's backend rejects."""
+        (tmp_path / "big.json").write_text(
+            '[{"text": "a", "id": 1}, {"text": "b", "id": 12345678901234567890}]', encoding='utf-8')
+        items = load_json(str(tmp_path))
+        assert [i['data']['meta']['id'] for i in items] == [1, 12345678901234567890]
+
     def test_empty_directory(self, tmp_path):
         items = load_json(str(tmp_path))
         assert items == []
 
 
 class TestLoadJsonl:
-    def test_loads_jsonl(self, tmp_data):
-        items = load_jsonl(str(tmp_data))
+    def test_loads_jsonl(self, tmp_data_str):
+        items = load_jsonl(tmp_data_str)
         assert len(items) == 2  # empty text skipped, blank line skipped
 
+    def test_numbers_beyond_orjson(self, tmp_path):
+        """Values orjson rejects still load and write like the stdlib json."""
+        (tmp_path / "big.jsonl").write_text('{"text": "t", "f": 1e400, "n": 123456789012345678901234}\n',
+                                            encoding='utf-8')
+        [item] = load_jsonl(str(tmp_path))
+        meta = item['data']['meta']
+        assert meta['f'] == float('inf')
+        assert meta['n'] == 123456789012345678901234
+        assert json.loads(_dumps_line(meta)) == meta
+        assert json.loads(_dumps([meta])) == [meta]
+
+    def test_long_integers_stay_exact(self, tmp_path, monkeypatch):
+        import import_data
+        monkeypatch.setattr(import_data, '_STDLIB_JSON', not import_data.HAS_ORJSON)
+        (tmp_path / "ids.jsonl").write_text('{"text": "t", "n": 123456789012345678901234}\n', encoding='utf-8')
+        [item] = load_jsonl(str(tmp_path))
+        assert item['data']['meta']['n'] == 123456789012345678901234
+
     def test_malformed_line(self, tmp_path):
         (tmp_path / "bad.jsonl").write_text('{"text": "ok"}\nNOT JSON\n', encoding='utf-8')
         with pytest.raises(json.JSONDecodeError):
             load_jsonl(str(tmp_path))
 
 
-# ─── Sentence splitting ─────────────────────────────────────────────────────
+# ─── CLI ─────────────────────────────────────────────────────────────────────
 
-class TestSentenceSplit:
-    def test_split(self, tmp_data):
-        """Only run if nltk is available."""
-        try:
-            from import_data import sentence_split
-        except ImportError:
-            pytest.skip("NLTK not available")
-        items = [{'text': 'Hello world. This is a test. Third sentence.', 'meta': {}}]
-        result = sentence_split(items)
-        assert len(result) == 1
-        assert isinstance(result[0]['text'], list)
-        assert len(result[0]['text']) == 3
+class TestMain:
+    def test_jsonl_output(self, tmp_path, monkeypatch):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        for name, text in [("a.txt", "First doc."), ("b.txt", "Second doc.\nTwo lines."), ("c.txt", "")]:
+            (data_dir / name).write_text(text, encoding='utf-8')
+        config = tmp_path / "config.yaml"
+        config.write_text(f"data:\n  format: text\n  source: {data_dir}\n  shuffle: false\n", encoding='utf-8')
+        out = tmp_path / "import.jsonl"
+        monkeypatch.setattr('sys.argv', ['import_data.py', '--config', str(config),
+                                         '--output', str(out), '--output-format', 'jsonl'])
+        main()
 
+        with open(out, encoding='utf-8') as f:
+            tasks = [json.loads(line) for line in f]
+        assert tasks == load_text_files(str(data_dir))
+        assert [t['data']['text'] for t in tasks] == ["First doc.", "Second doc.\nTwo lines."]
 
-# ─── Format for Label Studio ────────────────────────────────────────────────
 
-class TestFormatForLabelStudio:
-    def test_wraps_in_data(self):
-        items = [{'text': 'hello', 'meta': {'f': 'x'}}]
-        result = format_for_label_studio(items, 'classification')
-        assert len(result) == 1
-        assert result[0]['data']['text'] == 'hello'
+# ─── Sentence splitting ─────────────────────────────────────────────────────
+
+@pytest.fixture(scope="session")
+def punkt():
+    """Fetch and load the Punkt tokenizer once, outside the test bodies."""
+    return _get_punkt()
+
 
-    def test_empty_list(self):
-        assert format_for_label_studio([], 'span') == []
+@pytest.mark.skipif(not HAS_NLTK, reason="NLTK not available")
+class TestSentenceSplit:
+    def test_split(self, punkt):
+        items = [{'data': {'text': 'Hello world. This is a test. Third sentence.', 'meta': {}}}]
+        result = sentence_split(items)
+        assert len(result) == 1
+        assert isinstance(result[0]['data']['text'], list)
+        assert len(result[0]['data']['text']) == 3
+        assert result[0]['data']['meta']['sentence_count'] == 3
@@ -1,6 +1,7 @@
 """Tests for schema_builder.py"""
 import pytest
-from schema_builder import build_schema, build_label_xml, BUILDERS
+from functools import lru_cache
+from schema_builder import build_schema, build_label_xml, from_yaml_file, BUILDERS, _build_schema_cached
 
 
 # ─── Fixtures ────────────────────────────────────────────────────────────────
@@ -9,53 +10,51 @@ def make_labels(*names):
     return [{'name': n, 'color': '#FF0000', 'hotkey': str(i+1)} for i, n in enumerate(names)]
 
 
-BASIC_LABELS = make_labels('POS', 'NEG', 'NEU')
+BASIC_NAMES = ('POS', 'NEG', 'NEU')
+BASIC_LABELS = make_labels(*BASIC_NAMES)
 
 
-# ─── build_schema basics ────────────────────────────────────────────────────
-
-class TestBuildSchema:
-    def test_span_sentence(self):
-        xml = build_schema({'type': 'span', 'granularity': 'sentence', 'labels': BASIC_LABELS})
-        assert '<ParagraphLabels' in xml
-        assert '<Paragraphs' in xml
-        assert 'value="POS"' in xml
-
-    def test_span_character(self):
-        xml = build_schema({'type': 'span', 'granularity': 'character', 'labels': BASIC_LABELS})
-        assert '<Labels' in xml
-        assert '<Text' in xml
-
-    def test_classification_single(self):
-        xml = build_schema({'type': 'classification', 'labels': BASIC_LABELS})
-        assert '<Choices' in xml
-        assert 'choice="single"' in xml
+@pytest.fixture(scope="module")
+def schema_cache():
+    """build_schema memoized on keyword args; labels are given as a tuple of names."""
+    @lru_cache(maxsize=64)
+    def _build(labels=BASIC_NAMES, **spec):
+        return build_schema({**spec, 'labels': make_labels(*labels)})
+    return _build
 
-    def test_classification_multi(self):
-        xml = build_schema({'type': 'classification', 'multi_label': True, 'labels': BASIC_LABELS})
-        assert 'choice="multiple"' in xml
 
-    def test_ner(self):
-        xml = build_schema({'type': 'ner', 'labels': BASIC_LABELS})
-        assert '<Labels' in xml
-
-    def test_pairwise(self):
-        xml = build_schema({'type': 'pairwise', 'labels': make_labels('A_BETTER', 'B_BETTER', 'TIE')})
-        assert 'text_a' in xml
-        assert 'text_b' in xml
-
-    def test_unsupported_type_raises(self):
-        with pytest.raises(ValueError, match="Unsupported schema type"):
-            build_schema({'type': 'nonexistent', 'labels': BASIC_LABELS})
-
-    def test_case_insensitive_type(self):
-        xml = build_schema({'type': 'SPAN', 'granularity': 'SENTENCE', 'labels': BASIC_LABELS})
-        assert '<ParagraphLabels' in xml
+# ─── build_schema basics ────────────────────────────────────────────────────
 
-    def test_span_without_granularity_raises(self):
-        """Span type requires granularity (sentence or character)."""
-        with pytest.raises(ValueError):
-            build_schema({'type': 'span', 'labels': BASIC_LABELS})
+class TestBuildSchema:
+    @pytest.mark.parametrize("spec,needles", [
+        ({'type': 'span', 'granularity': 'sentence'}, ('<ParagraphLabels', '<Paragraphs', 'value="POS"')),
+        ({'type': 'span', 'granularity': 'character'}, ('<Labels', '<Text')),
+        ({'type': 'classification'}, ('<Choices', 'choice="single"')),
+        ({'type': 'classification', 'multi_label': True}, ('choice="multiple"',)),
+        ({'type': 'ner'}, ('<Labels',)),
+        ({'type': 'pairwise', 'labels': ('A_BETTER', 'B_BETTER', 'TIE')}, ('text_a', 'text_b')),
+        ({'type': 'SPAN', 'granularity': 'SENTENCE'}, ('<ParagraphLabels',)),  # case-insensitive
+    ], ids=['span_sentence', 'span_character', 'classification_single', 'classification_multi',
+            'ner', 'pairwise', 'case_insensitive_type'])
+    def test_builds(self, schema_cache, spec, needles):
+        xml = schema_cache(**spec)
+        for needle in needles:
+            assert needle in xml
+
+    @pytest.mark.parametrize("spec,match", [
+        ({'type': 'nonexistent'}, "Unsupported schema type"),
+        ({'type': 'span'}, None),  # span requires granularity (sentence or character)
+    ], ids=['unsupported_type', 'span_without_granularity'])
+    def test_invalid_spec_raises(self, spec, match):
+        with pytest.raises(ValueError, match=match):
+            build_schema({**spec, 'labels': BASIC_LABELS})
+
+    def test_write_streams_same_xml(self):
+        config = {'type': 'pairwise', 'labels': BASIC_LABELS}
+        chunks = []
+        assert build_schema(config, write=chunks.append) is None
+        assert len(chunks) > 1
+        assert ''.join(chunks) == build_schema(config)
 
 
 # ─── Edge cases ──────────────────────────────────────────────────────────────
@@ -65,8 +64,8 @@ class TestEdgeCases:
         with pytest.raises(ValueError, match="at least one label"):
             build_schema({'type': 'classification', 'labels': []})
 
-    def test_single_label(self):
-        xml = build_schema({'type': 'classification', 'labels': make_labels('ONLY')})
+    def test_single_label(self, schema_cache):
+        xml = schema_cache(type='classification', labels=('ONLY',))
         assert 'value="ONLY"' in xml
 
     def test_many_labels(self):
@@ -84,6 +83,7 @@ class TestEdgeCases:
         labels = [{'name': 'A & B', 'color': '#FF0000'}, {'name': '"quoted"', 'color': '#00FF00'}]
         xml = build_schema({'type': 'classification', 'labels': labels})
         assert '&amp;' in xml
+        assert 'value="&quot;quoted&quot;"' in xml
 
     def test_label_without_hotkey(self):
         labels = [{'name': 'TEST', 'color': '#FF0000'}]
@@ -95,6 +95,23 @@ class TestEdgeCases:
         xml = build_schema({'type': 'span', 'granularity': 'sentence', 'labels': labels})
         assert 'background=' in xml
 
+    def test_equal_hotkeys_render_as_given(self):
+        """1, 1.0 and True hash alike but must not share a cache entry."""
+        for hotkey in (1, 1.0, True):
+            xml = build_schema({'type': 'ner', 'labels': [{'name': 'A', 'hotkey': hotkey}]})
+            assert f'hotkey="{hotkey}"' in xml
+
+    def test_unhashable_color_still_builds(self):
+        xml = build_schema({'type': 'ner', 'labels': [{'name': 'A', 'color': ['#FF0000']}]})
+        assert "background=\"['#FF0000']\"" in xml
+
+    def test_repeat_config_hits_cache(self):
+        config = {'type': 'ner', 'labels': make_labels('CACHE_ME')}
+        first = build_schema(config)
+        hits = _build_schema_cached.cache_info().hits
+        assert build_schema(dict(config)) == first
+        assert _build_schema_cached.cache_info().hits == hits + 1
+
 
 # ─── build_label_xml ─────────────────────────────────────────────────────────
 
@@ -107,3 +124,17 @@ class TestBuildLabelXml:
         xml = build_label_xml(BASIC_LABELS, tag_name="Choice")
         assert '<Choice' in xml
         assert '<Label' not in xml
+
+
+# ─── from_yaml_file ──────────────────────────────────────────────────────────
+
+class TestFromYamlFile:
+    def test_yaml_config(self, tmp_path):
+        path = tmp_path / 'config.yaml'
+        path.write_text("schema:\n  type: ner\n  labels:\n    - name: PER\n")
+        assert 'value="PER"' in from_yaml_file(path)
+
+    def test_json_config(self, tmp_path):
+        path = tmp_path / 'config.json'
+        path.write_text('{"schema": {"type": "ner", "labels": [{"name": "PER"}]}}')
+        assert from_yaml_file(path) == build_schema({'type': 'ner', 'labels': [{'name': 'PER'}]})
@@ -0,0 +1,67 @@
+"""Tests for setup.py's scripted (--answers / --non-interactive) mode."""
+import importlib.util
+from pathlib import Path
+
+import pytest
+import yaml
+
+# setup.py lives at the repo root and isn't importable as a package module
+_spec = importlib.util.spec_from_file_location(
+    'setup_wizard', Path(__file__).resolve().parent.parent / 'setup.py')
+setup_wizard = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(setup_wizard)
+
+pytestmark = pytest.mark.xdist_group("io")
+
+
+@pytest.fixture
+def run(monkeypatch, tmp_path):
+    """Run the wizard non-interactively in tmp_path with the given answers."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(setup_wizard, '_NON_INTERACTIVE', True)
+
+    def _run(**answers):
+        monkeypatch.setattr(setup_wizard, '_ANSWERS', answers)
+        setup_wizard.run_wizard()
+        return tmp_path
+    return _run
+
+
+class TestAnswersFile:
+    def test_generates_files(self, run):
+        out = run(
+            project_name='Demo', deploy='1', domain_mode=3,
+            admin_email='admin@example.org', admin_password='secret',
+            team=[{'name': 'Ana', 'email': 'ana@example.org'}],
+            task_type=2, labels=['pos', 'neg'], label_descriptions={'POS': 'Good'},
+            data_format=5, export_schedule=3, git=False, agent=True,
+        )
+        config = yaml.safe_load((out / 'config.yaml').read_text(encoding='utf-8'))
+        assert config['project']['name'] == 'Demo'
+        assert [m['name'] for m in config['team']] == ['Admin', 'Ana']
+        assert config['schema']['type'] == 'classification'
+        assert [label['name'] for label in config['schema']['labels']] == ['POS', 'NEG']
+        assert config['schema']['labels'][0]['description'] == 'Good'
+        assert 'value="NEG"' in (out / 'label-config.xml').read_text(encoding='utf-8')
+        assert (out / 'docker-compose.yaml').is_file()
+        assert 'Ana' in (out / 'agent' / 'SOUL.md').read_text(encoding='utf-8')
+
+    def test_defaults_only(self, run):
+        out = run()
+        config = yaml.safe_load((out / 'config.yaml').read_text(encoding='utf-8'))
+        assert config['project']['name'] == 'My Annotation Project'
+        assert config['schema']['type'] == 'span'
+        assert not (out / 'agent').exists()
+
+    @pytest.mark.parametrize("answers", [
+        {'deploy': 'two'},
+        {'deploy': 9},
+        {'deploy': True},
+        {'team': ['Ana']},
+        {'team': {'name': 'Ana'}},
+        {'label_descriptions': ['Good']},
+    ], ids=['choice_word', 'choice_out_of_range', 'choice_bool', 'team_names',
+            'team_mapping', 'descriptions_list'])
+    def test_malformed_answer_exits(self, run, answers):
+        with pytest.raises(SystemExit, match="Invalid answer"):
+            run(**answers)